@@ -0,0 +1,319 @@
+"""end-to-end load benchmark of the account flows.
+
+Drives signup, activation, signin, profile creation, `/users/me` and
+`/auth/{account_id}` with a concurrent async client and prints
+p50/p95/p99 latency and throughput per route as JSON. By default the app
+and the email worker run in this process against the Postgres and Redis
+configured in `.env`, with emails delivered to an in-memory SMTP sink.
+Pass `--base-url` to load a running deployment instead, its worker must
+then send mail to `--smtp-port`.
+
+    python -m benchmarks.load --users 200 --concurrency 20 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import re
+import secrets
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+import httpx
+from jose import jwt
+
+from benchmarks.smtp_sink import SMTPSink
+from server.core.config import settings
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+PASSWORD = "Bench#Pass1"
+
+
+def percentile(ordered: List[float], rank: float) -> float:
+    """nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    index = max(math.ceil(rank / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Union[int, float]]:
+    ordered = sorted(latencies)
+    milliseconds = [latency * 1000 for latency in ordered]
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(milliseconds) / len(milliseconds), 3) if milliseconds else 0.0,
+        "p50_ms": round(percentile(milliseconds, 50), 3),
+        "p95_ms": round(percentile(milliseconds, 95), 3),
+        "p99_ms": round(percentile(milliseconds, 99), 3),
+        "max_ms": round(milliseconds[-1], 3) if milliseconds else 0.0,
+    }
+
+
+async def run_phase(
+    client: httpx.AsyncClient,
+    requests: List[Request],
+    concurrency: int,
+) -> Dict[str, Any]:
+    """send every request with at most `concurrency` in flight, responses with
+    a status of 400 or above are counted as errors."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    responses: List[Union[httpx.Response, None]] = [None] * len(requests)
+    errors = 0
+
+    async def send(index: int, request: Request) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await request(client)
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            responses[index] = response
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(index, request) for index, request in enumerate(requests)))
+    summary = summarize(latencies, errors, time.perf_counter() - started)
+    summary["responses"] = responses
+    return summary
+
+
+def signup_request(username: str) -> Request:
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.post(
+            "/auth/signup",
+            data={
+                "username": username,
+                "email": f"{username}@example.com",
+                "newPassword": PASSWORD,
+                "repeatNewPassword": PASSWORD,
+            },
+        )
+
+    return request
+
+
+def activation_request(validation_key: str) -> Request:
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.get(f"/auth/activate-account/{validation_key}")
+
+    return request
+
+
+def signin_request(username: str) -> Request:
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.post("/auth/signin", data={"username": username, "password": PASSWORD})
+
+    return request
+
+
+def create_user_request(token: str) -> Request:
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.post(
+            "/users/",
+            data={"firstName": "Bench", "lastName": "Mark", "gender": "m", "birthday": "1990-01-01T00:00:00"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    return request
+
+
+def read_me_request(token: str) -> Request:
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+
+    return request
+
+
+def read_account_request(token: str) -> Request:
+    account_id = jwt.get_unverified_claims(token)["id"]
+
+    def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+        return client.get(f"/auth/{account_id}", headers={"Authorization": f"Bearer {token}"})
+
+    return request
+
+
+def read_activation_keys(sink: SMTPSink) -> Dict[str, str]:
+    """map recipient to the validation key found in its activation email."""
+    pattern = re.compile(rf"{re.escape(str(settings.ACTIVATION_URL).rstrip('/'))}/(\S+)")
+    keys = {}
+    for message in sink.messages:
+        match = pattern.search(message.get_body(preferencelist=("plain", "html")).get_content())
+        if match:
+            keys[message["To"]] = match.group(1)
+    return keys
+
+
+def get_commit() -> Union[str, None]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient,
+    sink: SMTPSink,
+    users: int,
+    concurrency: int,
+    reads_per_user: int,
+    email_timeout: float,
+) -> Dict[str, Dict[str, Any]]:
+    """run every phase and return the per-route results together with how many
+    accounts made it through signup and activation, failed signups send no
+    email and are left out of the later phases."""
+    run_id = secrets.token_hex(3)
+    usernames = [f"bench{run_id}{index:05d}" for index in range(users)]
+    routes = {}
+
+    def record(name: str, result: Dict[str, Any]) -> List[Union[httpx.Response, None]]:
+        responses = result.pop("responses")
+        routes[name] = result
+        return responses
+
+    signups = [signup_request(name) for name in usernames]
+    responses = record("auth:signup", await run_phase(client, signups, concurrency))
+    usernames = [
+        name for name, response in zip(usernames, responses) if response is not None and response.status_code == 201
+    ]
+
+    emails_complete = await sink.wait_for(len(usernames), timeout=email_timeout)
+    keys = read_activation_keys(sink)
+    emails = [f"{name}@example.com" for name in usernames]
+    activations = [activation_request(keys[email]) for email in emails if email in keys]
+    record("auth:activation", await run_phase(client, activations, concurrency))
+
+    signins = [signin_request(name) for name in usernames]
+    responses = record("auth:signin", await run_phase(client, signins, concurrency))
+    tokens = [
+        response.json()["access_token"]
+        for response in responses
+        if response is not None and response.status_code == 202
+    ]
+
+    record("user:create-user", await run_phase(client, [create_user_request(token) for token in tokens], concurrency))
+    reads = [read_me_request(token) for token in tokens for _ in range(reads_per_user)]
+    record("user:read-user", await run_phase(client, reads, concurrency))
+    reads = [read_account_request(token) for token in tokens for _ in range(reads_per_user)]
+    record("account:info", await run_phase(client, reads, concurrency))
+
+    accounts = {
+        "requested": users,
+        "signed_up": len(usernames),
+        "signup_failures": users - len(usernames),
+        "activation_emails": len(activations),
+        "activation_emails_timed_out": not emails_complete,
+    }
+    return {"accounts": accounts, "routes": routes}
+
+
+async def run_in_process(args: argparse.Namespace, sink: SMTPSink) -> Dict[str, Dict[str, Any]]:
+    from server.main import app
+    from server.services.mailer import mail_sender
+    from server.services.renderer import email_renderer
+    from server.worker import get_worker
+
+    mail_sender.config = mail_sender.config.copy(
+        update={
+            "MAIL_SERVER": sink.host,
+            "MAIL_PORT": sink.port,
+            "MAIL_STARTTLS": False,
+            "MAIL_SSL_TLS": False,
+            "USE_CREDENTIALS": False,
+            "SUPPRESS_SEND": 0,
+        },
+    )
+
+    await app.router.startup()
+    mail_sender.start()
+    email_renderer.load()
+    worker = get_worker()
+    worker_task = asyncio.create_task(worker.run())
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            return await run_benchmark(
+                client,
+                sink,
+                users=args.users,
+                concurrency=args.concurrency,
+                reads_per_user=args.reads_per_user,
+                email_timeout=args.email_timeout,
+            )
+    finally:
+        worker.stop()
+        await worker_task
+        await mail_sender.stop()
+        await app.router.shutdown()
+
+
+async def run_remote(args: argparse.Namespace, sink: SMTPSink) -> Dict[str, Dict[str, Any]]:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        return await run_benchmark(
+            client,
+            sink,
+            users=args.users,
+            concurrency=args.concurrency,
+            reads_per_user=args.reads_per_user,
+            email_timeout=args.email_timeout,
+        )
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    sink = SMTPSink(port=args.smtp_port if args.base_url else 0)
+    await sink.start()
+    started_at = datetime.now(timezone.utc).isoformat()
+    try:
+        result = await (run_remote(args, sink) if args.base_url else run_in_process(args, sink))
+    finally:
+        await sink.stop()
+
+    return {
+        "commit": get_commit(),
+        "started_at": started_at,
+        "target": args.base_url or "in-process",
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "reads_per_user": args.reads_per_user,
+        "accounts": result["accounts"],
+        "routes": result["routes"],
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load benchmark of the account flows")
+    parser.add_argument("--users", type=int, default=100, help="accounts created by the run")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight at the same time")
+    parser.add_argument(
+        "--reads-per-user",
+        type=int,
+        default=10,
+        help="`/users/me` and `/auth/{account_id}` requests per account",
+    )
+    parser.add_argument("--base-url", default=None, help="load a running server instead of the in-process app")
+    parser.add_argument("--smtp-port", type=int, default=8025, help="SMTP sink port used with --base-url")
+    parser.add_argument("--email-timeout", type=float, default=60.0, help="seconds to wait for activation emails")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds with --base-url")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file instead of stdout")
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = get_parser().parse_args()
+    report = json.dumps(asyncio.run(main(arguments)), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,195 @@
+"""fixed-iteration microbenchmarks of the security primitives.
+
+Every case is timed `repeats` times over a fixed number of calls and the
+fastest run is kept as the per-call cost, which is the least noisy
+estimate on a shared machine. Results are compared with the baseline in
+`benchmarks/baselines/security.json` and the process exits with status 1
+when any case got slower than the allowed percentage. It exits with
+status 2 without running the cases when the baseline was recorded in a
+different environment.
+
+    python -m benchmarks.security                      # compare with the baseline
+    python -m benchmarks.security --threshold 50       # allow 50% slowdown
+    python -m benchmarks.security --update-baseline    # record new numbers
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Union
+
+from server.cache.memory import MemoryCache
+from server.core.config import settings
+from server.models.user import Account
+from server.security.hash import hash_generator
+from server.security.token import JWTGenerator, generate_account_validation_token
+from server.services.formatters import format_dict_key_to_camel_case
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "security.json"
+DEFAULT_THRESHOLD = 25.0
+
+
+class Case(NamedTuple):
+    name: str
+    function: Callable[[], Any]
+    iterations: int
+
+
+def get_cases() -> List[Case]:
+    account = Account(id=1, username="benchmark", email="benchmark@example.com", phone_number=None)
+    salt = hash_generator.generate_salt_hash
+    hashed_password = hash_generator.generate_password_hash(hash_salt=salt, password="Bench#Pass1")
+    uncached = JWTGenerator(cache=None)
+    cached = JWTGenerator(cache=MemoryCache(max_size=16, ttl=None))
+    token = uncached.generate_access_token(account=account)
+
+    return [
+        Case("hash:generate_salt_hash", lambda: hash_generator.generate_salt_hash, 5),
+        Case(
+            "hash:generate_password_hash",
+            lambda: hash_generator.generate_password_hash(hash_salt=salt, password="Bench#Pass1"),
+            5,
+        ),
+        Case(
+            "hash:is_password_verified",
+            lambda: hash_generator.is_password_verified(
+                password=salt + "Bench#Pass1",
+                hashed_password=hashed_password,
+            ),
+            5,
+        ),
+        Case("jwt:generate_access_token", lambda: uncached.generate_access_token(account=account), 2000),
+        Case("jwt:retrieve_token_details", lambda: uncached.retrieve_token_details(token), 2000),
+        Case("jwt:retrieve_token_details:cached", lambda: cached.retrieve_token_details(token), 20000),
+        Case("validation:generate_account_validation_token", generate_account_validation_token, 20000),
+        Case("formatters:format_dict_key_to_camel_case", lambda: format_dict_key_to_camel_case("phone_number"), 20000),
+    ]
+
+
+def time_case(case: Case, repeats: int) -> float:
+    """per-call cost of the fastest of `repeats` runs, in microseconds."""
+    case.function()
+    fastest = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(case.iterations):
+            case.function()
+        fastest = min(fastest, time.perf_counter() - started)
+    return fastest / case.iterations * 1_000_000
+
+
+def get_environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "PASSWORD_HASH_ALGORITHM": settings.PASSWORD_HASH_ALGORITHM,
+        "SALT_HASH_ALGORITHM": settings.SALT_HASH_ALGORITHM,
+        "JWT_ALGORITHM": settings.JWT_ALGORITHM,
+    }
+
+
+def run_cases(cases: List[Case], repeats: int) -> Dict[str, Dict[str, Union[int, float]]]:
+    return {
+        case.name: {"iterations": case.iterations, "per_call_us": round(time_case(case, repeats), 3)} for case in cases
+    }
+
+
+def get_environment_changes(
+    environment: Dict[str, str],
+    baseline: Dict[str, str],
+) -> Dict[str, Dict[str, Union[str, None]]]:
+    """keys whose value differs between this run and the baseline, timings from
+    different interpreters, machines or algorithms are not comparable."""
+    return {
+        key: {"baseline": baseline.get(key), "current": environment.get(key)}
+        for key in sorted(set(environment) | set(baseline))
+        if environment.get(key) != baseline.get(key)
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Union[int, float]]],
+    baseline: Dict[str, Dict[str, Union[int, float]]],
+    threshold: float,
+) -> Dict[str, Dict[str, Union[bool, float, None]]]:
+    """change of every case against the baseline in percent, a case regresses
+    when it got slower by more than `threshold` percent."""
+    report = {}
+    for name, result in results.items():
+        if name not in baseline:
+            report[name] = {"change_percent": None, "regressed": False}
+            continue
+
+        change = (result["per_call_us"] / baseline[name]["per_call_us"] - 1) * 100
+        report[name] = {"change_percent": round(change, 2), "regressed": change > threshold}
+    return report
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the security primitives")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per case, the fastest one is kept")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"allowed slowdown in percent, defaults to the baseline's or {DEFAULT_THRESHOLD}",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument(
+        "--ignore-environment",
+        action="store_true",
+        help="compare even when the baseline was recorded in a different environment",
+    )
+    return parser
+
+
+def main(args: argparse.Namespace) -> int:
+    environment = get_environment()
+    if not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        changes = get_environment_changes(environment, baseline["environment"])
+        if changes:
+            print(f"environment differs from the baseline: {json.dumps(changes)}", file=sys.stderr)
+            if not args.ignore_environment:
+                print("refusing to compare, pass --ignore-environment or --update-baseline", file=sys.stderr)
+                return 2
+            print("WARNING: comparing against a baseline from a different environment", file=sys.stderr)
+
+    results = run_cases(get_cases(), repeats=args.repeats)
+
+    if args.update_baseline:
+        threshold = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+        baseline = {"environment": environment, "threshold": threshold, "cases": results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(json.dumps(baseline, indent=2))
+        return 0
+
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", DEFAULT_THRESHOLD)
+    report = compare(results, baseline["cases"], threshold)
+    print(
+        json.dumps(
+            {
+                "environment": environment,
+                "baseline_environment": baseline["environment"],
+                "threshold": threshold,
+                "cases": {name: {**results[name], **report[name]} for name in results},
+            },
+            indent=2,
+        ),
+    )
+
+    regressed = [name for name, item in report.items() if item["regressed"]]
+    if regressed:
+        print(f"regressed past {threshold}%: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(get_parser().parse_args()))
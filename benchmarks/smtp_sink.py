@@ -0,0 +1,74 @@
+import asyncio
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List, Union
+
+
+class SMTPSink:
+    """minimal SMTP server that accepts every message and keeps it in memory,
+    so the benchmark measures the app instead of a mail relay."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages: List[EmailMessage] = []
+        self._server: Union[asyncio.AbstractServer, None] = None
+        self._received = asyncio.Condition()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._server = None
+
+    async def wait_for(self, count: int, timeout: float) -> bool:
+        """wait until `count` messages arrived, False when the timeout ran out
+        first."""
+        async with self._received:
+            try:
+                await asyncio.wait_for(self._received.wait_for(lambda: len(self.messages) >= count), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _read_data(self, reader: asyncio.StreamReader) -> bytes:
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b".\r\n", b".\n", b""):
+                return b"".join(lines)
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 smtp-sink ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-smtp-sink\r\n250 8BITMIME\r\n")
+            elif command == b"DATA":
+                writer.write(b"354 end data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                message = message_from_bytes(await self._read_data(reader), policy=policy.default)
+                async with self._received:
+                    self.messages.append(message)
+                    self._received.notify_all()
+                writer.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                break
+            elif command in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                writer.write(b"250 OK\r\n")
+            else:
+                writer.write(b"502 command not implemented\r\n")
+            await writer.drain()
+
+        await writer.drain()
+        writer.close()
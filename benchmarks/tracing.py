@@ -0,0 +1,188 @@
+"""overhead of tracing on requests that are sampled out.
+
+A small app decodes a JWT behind traced calls, the way the dependencies,
+CRUD and cache methods are wrapped in the real app, and is driven
+through its ASGI interface. Each variant is timed `repeats` times over a
+fixed number of requests, alternating with the other variants, and the
+medians are reported. The process exits with status 1 when requests that
+are sampled out are slower than with tracing disabled by more than the
+allowed percentage.
+
+    python -m benchmarks.tracing                  # allow 2% overhead
+    python -m benchmarks.tracing --threshold 5    # allow 5% overhead
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Union
+
+from fastapi import FastAPI
+
+from benchmarks.security import get_environment
+from server.models.user import Account
+from server.security.token import JWTGenerator
+from server.services import tracing
+from server.services.tracing import SpanExporter, Tracer, TracingMiddleware, traced
+
+DEFAULT_THRESHOLD = 2.0
+TRACED_CALLS = 3
+
+
+def get_tracers() -> Dict[str, Tracer]:
+    return {
+        "disabled": Tracer(exporter=None, sample_rate=0.0),
+        "sampled_out": Tracer(exporter=SpanExporter(service_name="benchmark", flush_interval=60), sample_rate=0.0),
+        "sampled": Tracer(exporter=SpanExporter(service_name="benchmark", flush_interval=60), sample_rate=1.0),
+    }
+
+
+def make_app(tracer: Tracer) -> FastAPI:
+    """build the app while `tracer` is the module tracer, `traced` leaves
+    functions untouched when it is disabled just like at import time."""
+    tracing.tracer = tracer
+    account = Account(id=1, username="benchmark", email="benchmark@example.com", phone_number=None)
+    generator = JWTGenerator(cache=None)
+    token = generator.generate_access_token(account=account)
+
+    @traced("decode_user_token")
+    async def decode_user_token():
+        return generator.retrieve_token_details(token)
+
+    @traced("AccountRedis.get_account_data")
+    async def get_account_data(account_id: int):
+        return None
+
+    @traced("AccountCRUD.read_account_by_id")
+    async def read_account_by_id(account_id: int):
+        return account
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/users/me")
+    async def read_me():
+        user_data = await decode_user_token()
+        for _ in range(TRACED_CALLS):
+            await get_account_data(user_data.id)
+        user = await read_account_by_id(user_data.id)
+        return {"id": user.id, "username": user.username}
+
+    return app
+
+
+def get_request(app: FastAPI) -> Callable:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users/me",
+        "raw_path": b"/users/me",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive() -> Dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict) -> None:
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"benchmark request failed with status {message['status']}")
+
+    async def request() -> None:
+        await app(dict(scope), receive, send)
+
+    return request
+
+
+async def time_requests(request: Callable, iterations: int) -> float:
+    """duration of `iterations` requests with the garbage collector paused,
+    like timeit, so a collection does not land in one variant only."""
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await request()
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+async def run_variants(iterations: int, repeats: int) -> Dict[str, Dict[str, Union[int, float]]]:
+    """median per-request cost of every variant in microseconds and its
+    overhead against tracing disabled, taken as the median of the ratios
+    between runs of the same repeat.
+
+    The variants take turns in a rotating order so drift of the machine
+    hits all of them evenly.
+    """
+    tracers = get_tracers()
+    requests = {name: get_request(make_app(tracer)) for name, tracer in tracers.items()}
+    names = list(tracers)
+    durations: Dict[str, List[float]] = {name: [] for name in names}
+    ratios: Dict[str, List[float]] = {name: [] for name in names}
+
+    for repeat in range(repeats):
+        timings = {}
+        shift = repeat % len(names)
+        for name in names[shift:] + names[:shift]:
+            tracer = tracing.tracer = tracers[name]
+            if tracer.exporter is not None:
+                tracer.exporter.buffer.clear()
+            await requests[name]()
+            timings[name] = await time_requests(requests[name], iterations)
+        for name, duration in timings.items():
+            durations[name].append(duration)
+            ratios[name].append(duration / timings["disabled"])
+
+    return {
+        name: {
+            "iterations": iterations,
+            "per_request_us": round(statistics.median(durations[name]) / iterations * 1_000_000, 3),
+            "overhead_percent": round((statistics.median(ratios[name]) - 1) * 100, 2),
+        }
+        for name in names
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Overhead of tracing on sampled out requests")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per run")
+    parser.add_argument("--repeats", type=int, default=100, help="runs per variant, the medians are reported")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed overhead of sampled out requests in percent",
+    )
+    return parser
+
+
+def main(args: argparse.Namespace) -> int:
+    original = tracing.tracer
+    try:
+        results = asyncio.run(run_variants(iterations=args.iterations, repeats=args.repeats))
+    finally:
+        tracing.tracer = original
+
+    overhead = results["sampled_out"]["overhead_percent"]
+    print(json.dumps({"environment": get_environment(), "threshold": args.threshold, "variants": results}, indent=2))
+
+    if overhead > args.threshold:
+        print(f"sampled out requests are {overhead}% slower, more than {args.threshold}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(get_parser().parse_args()))
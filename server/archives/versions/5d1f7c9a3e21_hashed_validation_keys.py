@@ -0,0 +1,31 @@
+"""hashed validation keys.
+
+Revision ID: 5d1f7c9a3e21
+Revises: 02b93897c8e3
+Create Date: 2026-10-18 06:30:12.417305
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d1f7c9a3e21"  # pragma: allowlist secret
+down_revision = "02b93897c8e3"  # pragma: allowlist secret
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keys are stored as their sha256 digest from now on, hash the pending ones
+    # so links that were already emailed keep working until they expire
+    op.execute("UPDATE account_validations SET validation_key = encode(sha256(validation_key::bytea), 'hex');")
+    op.create_index(
+        op.f("ix_account_validations_validation_key"),
+        "account_validations",
+        ["validation_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_account_validations_validation_key"), table_name="account_validations")
+    # digests cannot be turned back into plain keys
+    op.execute("DELETE FROM account_validations;")
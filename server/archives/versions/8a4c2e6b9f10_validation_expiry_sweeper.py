@@ -0,0 +1,48 @@
+"""validation expiry sweeper.
+
+Revision ID: 8a4c2e6b9f10
+Revises: 5d1f7c9a3e21
+Create Date: 2026-10-18 06:41:37.902114
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a4c2e6b9f10"  # pragma: allowlist secret
+down_revision = "5d1f7c9a3e21"  # pragma: allowlist secret
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # expired keys are purged in batches by the application sweeper instead
+    op.execute("DROP TRIGGER IF EXISTS delete_expired_account_validations_trigger ON account_validations;")
+    op.execute("DROP FUNCTION IF EXISTS delete_expired_account_validations();")
+    op.create_index(
+        op.f("ix_account_validations_created_at"),
+        "account_validations",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_account_validations_created_at"), table_name="account_validations")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION delete_expired_account_validations()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            DELETE FROM account_validations WHERE created_at < NOW() - INTERVAL '5 minutes';
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER delete_expired_account_validations_trigger
+        BEFORE INSERT ON account_validations
+        FOR EACH ROW
+        EXECUTE FUNCTION delete_expired_account_validations();
+    """
+    )
@@ -1,25 +1,126 @@
-from pydantic import parse_raw_as
+from typing import Dict, Iterable, List, Union
+
+import orjson
+from aioredis.client import Redis
 
 from server.cache.base import RedisBase
+from server.cache.memory import MemoryCache
+from server.core.config import settings
 from server.models.user import Account
 from server.schemas.account import AccountInformationResponse
+from server.services.formatters import parse_isoformat
+from server.services.metrics import account_cache_requests
+from server.services.responses import dump_json
+
+
+def get_account_memory_cache() -> Union[MemoryCache, None]:
+    if settings.ACCOUNT_MEMORY_CACHE_SIZE <= 0:
+        return None
+    return MemoryCache(
+        max_size=settings.ACCOUNT_MEMORY_CACHE_SIZE,
+        ttl=settings.ACCOUNT_MEMORY_CACHE_TTL,
+    )
+
+
+account_memory_cache: Union[MemoryCache, None] = get_account_memory_cache()
 
 
 class AccountRedis(RedisBase):
+    def __init__(self, redis: Union[Redis, None] = None, memory: Union[MemoryCache, None] = None):
+        super().__init__(redis=redis)
+        self.memory = memory if memory is not None else account_memory_cache
+
+    @staticmethod
+    def _get_key(user_id: int) -> str:
+        return f"auth-{user_id}"
+
+    @staticmethod
+    def _get_value(user: Account) -> AccountInformationResponse:
+        return AccountInformationResponse.construct_from_orm(user)
+
+    @staticmethod
+    def _dump_value(value: AccountInformationResponse) -> bytes:
+        return dump_json(value.dict())
+
+    @staticmethod
+    def _parse_value(user_data: Union[str, bytes]) -> AccountInformationResponse:
+        """cached values were validated before they were written, so they are
+        only decoded here instead of going through the schema again."""
+        values = orjson.loads(user_data)
+        for field in ("created_at", "updated_at"):
+            if values.get(field):
+                values[field] = parse_isoformat(values[field])
+        return AccountInformationResponse.construct(**values)
+
     async def set_account_data(self, user: Account):
-        value = AccountInformationResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            phone_number=user.phone_number,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-        )
-        await self.redis.set(f"auth-{user.id}", value.json(), ex=30)
+        value = self._get_value(user)
+        await self.redis.set(self._get_key(user.id), self._dump_value(value), ex=settings.ACCOUNT_CACHE_TTL)
+        if self.memory is not None:
+            self.memory.set(user.id, value)
+
+    async def set_many_account_data(self, users: Iterable[Account]) -> List[AccountInformationResponse]:
+        """cache several accounts with one pipelined round trip and return the
+        cached values."""
+        values = [self._get_value(user) for user in users]
+        if not values:
+            return values
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for value in values:
+                pipe.set(self._get_key(value.id), self._dump_value(value), ex=settings.ACCOUNT_CACHE_TTL)
+            await pipe.execute()
+
+        if self.memory is not None:
+            for value in values:
+                self.memory.set(value.id, value)
+        return values
 
     async def get_account_data(self, user_id: int):
-        user_data = await self.redis.get(f"auth-{user_id}")
+        if self.memory is not None:
+            user = self.memory.get(user_id)
+            account_cache_requests.inc(tier="memory", result="miss" if user is None else "hit")
+            if user is not None:
+                return user
+
+        user_data = await self.redis.get(self._get_key(user_id))
+        account_cache_requests.inc(tier="redis", result="hit" if user_data else "miss")
         if user_data:
-            return parse_raw_as(type_=AccountInformationResponse, b=user_data)
+            user = self._parse_value(user_data)
+            if self.memory is not None:
+                self.memory.set(user_id, user)
+            return user
+
+    async def get_many_account_data(self, user_ids: Iterable[int]) -> Dict[int, AccountInformationResponse]:
+        """resolve several accounts at once, from worker memory first and the
+        rest with a single MGET, ids that are not cached are left out."""
+        users: Dict[int, AccountInformationResponse] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            user = self.memory.get(user_id) if self.memory is not None else None
+            if user is not None:
+                users[user_id] = user
+            else:
+                missing.append(user_id)
+
+        if self.memory is not None:
+            account_cache_requests.inc(len(users), tier="memory", result="hit")
+            account_cache_requests.inc(len(missing), tier="memory", result="miss")
+        if not missing:
+            return users
+
+        values = await self.redis.mget([self._get_key(user_id) for user_id in missing])
+        hits = sum(1 for user_data in values if user_data)
+        account_cache_requests.inc(hits, tier="redis", result="hit")
+        account_cache_requests.inc(len(missing) - hits, tier="redis", result="miss")
+        for user_id, user_data in zip(missing, values):
+            if user_data:
+                user = self._parse_value(user_data)
+                if self.memory is not None:
+                    self.memory.set(user_id, user)
+                users[user_id] = user
+        return users
+
+    async def delete_account_data(self, user_id: int):
+        if self.memory is not None:
+            self.memory.delete(user_id)
+        await self.redis.delete(self._get_key(user_id))
@@ -1,6 +1,74 @@
-from aioredis.client import Redis
+from typing import Optional, Union
+
+from aioredis import BlockingConnectionPool
+from aioredis.client import Pipeline, Redis
+
+from server.core.config import settings
+from server.services.timing import track
+from server.services.tracing import trace_public_methods, tracer
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with track("cache"), tracer.span("redis PIPELINE", commands=len(self.command_stack)):
+            return await super().execute(raise_on_error=raise_on_error)
+
+
+class InstrumentedRedis(Redis):
+    """redis client that adds the time of every command and pipeline to the
+    `Server-Timing` of the current request."""
+
+    async def execute_command(self, *args, **options):
+        with track("cache"), tracer.span(f"redis {args[0]}"):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+redis_pool: Union[BlockingConnectionPool, None] = None
+redis_client: Union[Redis, None] = None
+
+
+def create_redis_pool() -> BlockingConnectionPool:
+    """create the process wide connection pool, requests wait up to
+    `REDIS_POOL_TIMEOUT` seconds for a free connection when it is exhausted."""
+    return BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+def get_redis() -> Redis:
+    global redis_pool, redis_client
+
+    if redis_client is None:
+        redis_pool = create_redis_pool()
+        redis_client = InstrumentedRedis(connection_pool=redis_pool)
+    return redis_client
+
+
+async def connect_redis() -> None:
+    get_redis()
+
+
+async def disconnect_redis() -> None:
+    global redis_pool, redis_client
+
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+    redis_pool = None
+    redis_client = None
 
 
 class RedisBase:
-    def __init__(self, redis: Redis):
-        self.redis = redis
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_public_methods(cls)
+
+    def __init__(self, redis: Union[Redis, None] = None):
+        self.redis = redis or get_redis()
@@ -0,0 +1,141 @@
+import json
+import time
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
+from aioredis.client import Redis
+from aioredis.exceptions import ResponseError
+
+from server.cache.base import RedisBase
+from server.core.config import settings
+
+# runs as one script so a due job can never be removed from the delayed set
+# without being added back to the stream
+PROMOTE_DUE_JOBS_SCRIPT = """
+local members = redis.call("ZRANGEBYSCORE", KEYS[1], 0, ARGV[1], "LIMIT", 0, ARGV[2])
+for _, member in ipairs(members) do
+    local fields = {}
+    for field, value in pairs(cjson.decode(member)) do
+        table.insert(fields, field)
+        table.insert(fields, tostring(value))
+    end
+    redis.call("ZREM", KEYS[1], member)
+    redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], "*", unpack(fields))
+end
+return #members
+"""
+
+
+class Job(NamedTuple):
+    id: str
+    name: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class JobQueue(RedisBase):
+    """durable job queue on a redis stream read through a consumer group.
+
+    Jobs waiting for a retry sit in a sorted set scored by the time they
+    become due, jobs that ran out of attempts are moved to a dead letter
+    stream together with the last error.
+    """
+
+    def __init__(self, redis: Union[Redis, None] = None):
+        super().__init__(redis=redis)
+        self.stream = settings.JOB_STREAM
+        self.group = settings.JOB_GROUP
+        self.delayed_key = f"{settings.JOB_STREAM}:delayed"
+        self.dead_letter_stream = f"{settings.JOB_STREAM}:dead"
+
+    @staticmethod
+    def _get_fields(name: str, payload: Dict[str, Any], attempts: int) -> Dict[str, Union[str, int]]:
+        return {"name": name, "payload": json.dumps(payload), "attempts": attempts}
+
+    @staticmethod
+    def _get_next_id(job_id: str) -> str:
+        milliseconds, sequence = job_id.split("-")
+        return f"{milliseconds}-{int(sequence) + 1}"
+
+    @staticmethod
+    def _parse_entries(entries: List[Tuple[str, Dict[str, str]]]) -> List[Job]:
+        return [
+            Job(
+                id=job_id,
+                name=fields["name"],
+                payload=json.loads(fields["payload"]),
+                attempts=int(fields["attempts"]),
+            )
+            for job_id, fields in entries
+            if fields
+        ]
+
+    async def create_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+
+    async def enqueue(self, name: str, payload: Dict[str, Any], attempts: int = 0) -> str:
+        return await self.redis.xadd(
+            self.stream,
+            self._get_fields(name, payload, attempts),
+            maxlen=settings.JOB_STREAM_MAX_LENGTH,
+        )
+
+    async def read_jobs(self, consumer: str, count: int, block: int) -> List[Job]:
+        response = await self.redis.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=block)
+        return [job for _, entries in response or [] for job in self._parse_entries(entries)]
+
+    async def claim_stale_jobs(self, consumer: str, min_idle: int, count: int) -> List[Job]:
+        """take over up to `count` jobs delivered to a consumer that has not
+        acknowledged them within `min_idle` milliseconds, e.g. a worker that
+        crashed, paging through the whole pending list to find them."""
+        job_ids: List[str] = []
+        start = "-"
+        while len(job_ids) < count:
+            pending = await self.redis.xpending_range(self.stream, self.group, start, "+", count)
+            job_ids.extend(entry["message_id"] for entry in pending if entry["time_since_delivered"] >= min_idle)
+            if len(pending) < count:
+                break
+            start = self._get_next_id(pending[-1]["message_id"])
+        if not job_ids:
+            return []
+
+        entries = await self.redis.xclaim(self.stream, self.group, consumer, min_idle, job_ids[:count])
+        return self._parse_entries(entries)
+
+    async def ack(self, job_id: str) -> None:
+        await self.redis.xack(self.stream, self.group, job_id)
+
+    async def retry(self, job: Job, delay: float) -> None:
+        """the member carries the id of the failed entry, so identical jobs
+        failing at the same attempt stay separate members of the set."""
+        fields = self._get_fields(job.name, job.payload, job.attempts + 1)
+        fields["retry_of"] = job.id
+        member = json.dumps(fields)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.zadd(self.delayed_key, {member: time.time() + delay})
+            await pipe.execute()
+
+    async def dead_letter(self, job: Job, error: str) -> None:
+        fields = self._get_fields(job.name, job.payload, job.attempts + 1)
+        fields["error"] = error
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xadd(self.dead_letter_stream, fields, maxlen=settings.JOB_STREAM_MAX_LENGTH)
+            await pipe.execute()
+
+    async def promote_due_jobs(self, limit: int = 100) -> int:
+        """move retries whose backoff has elapsed back onto the stream, the
+        removal from the delayed set and the XADD run in one script."""
+        return await self.redis.eval(
+            PROMOTE_DUE_JOBS_SCRIPT,
+            2,
+            self.delayed_key,
+            self.stream,
+            time.time(),
+            limit,
+            settings.JOB_STREAM_MAX_LENGTH,
+        )
@@ -0,0 +1,52 @@
+from typing import List, Sequence, Tuple
+
+from server.cache.base import RedisBase
+from server.core.config import settings
+from server.schemas.token import JWTClaims
+from server.security.token import hash_access_token
+
+
+class TokenRevocationRedis(RedisBase):
+    """revocations shared by all workers, a single token is revoked on signout
+    and every token of an account by bumping its generation when the
+    credentials change."""
+
+    @staticmethod
+    def _get_key(digest: str) -> str:
+        return f"token-revoked-{digest}"
+
+    @staticmethod
+    def _get_generation_key(account_id: int) -> str:
+        return f"token-generation-{account_id}"
+
+    async def get_generation(self, account_id: int) -> int:
+        generation = await self.redis.get(self._get_generation_key(account_id))
+        return int(generation or 0)
+
+    async def revoke_token(self, token: str) -> None:
+        """the key outlives the token, access tokens are never valid for more
+        than `JWT_MIN` minutes."""
+        await self.redis.set(self._get_key(hash_access_token(token)), 1, ex=settings.JWT_MIN * 60)
+
+    async def revoke_account_tokens(self, account_id: int) -> int:
+        """the generation is kept without expiry, so it never falls back to a
+        value that tokens still in circulation were issued with."""
+        return await self.redis.incr(self._get_generation_key(account_id))
+
+    async def get_revoked(self, tokens: Sequence[Tuple[str, JWTClaims]]) -> List[bool]:
+        """check verified tokens with a single MGET, in the order given."""
+        if not tokens:
+            return []
+
+        keys = []
+        for token, user_data in tokens:
+            keys += [self._get_key(hash_access_token(token)), self._get_generation_key(user_data.id)]
+        values = await self.redis.mget(keys)
+        return [
+            bool(revoked) or user_data.generation < int(generation or 0)
+            for (_, user_data), revoked, generation in zip(tokens, values[::2], values[1::2])
+        ]
+
+    async def is_revoked(self, token: str, user_data: JWTClaims) -> bool:
+        revoked = await self.get_revoked([(token, user_data)])
+        return revoked[0]
@@ -0,0 +1,88 @@
+from server.cache.base import RedisBase
+from server.core.config import settings
+from server.models.user import AccountValidation
+from server.security.token import (
+    generate_account_validation_token,
+    hash_account_validation_token,
+)
+from server.services.exceptions import EntityDoesNotExist
+
+# replaces the account's pending key in one step, so two concurrent requests
+# cannot both read the same old key and leave an orphaned one behind
+CREATE_VALIDATION_SCRIPT = """
+local old_digest = redis.call("GET", KEYS[1])
+if old_digest then
+    redis.call("DEL", ARGV[4] .. old_digest)
+end
+redis.call("SET", KEYS[2], ARGV[2], "EX", ARGV[3])
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[3])
+return old_digest
+"""
+
+# consumes the key and only clears the account's pointer while it still
+# refers to the consumed key, a newer key created in the meantime is kept
+CONSUME_VALIDATION_SCRIPT = """
+local account_id = redis.call("GET", KEYS[1])
+if not account_id then
+    return false
+end
+redis.call("DEL", KEYS[1])
+local account_key = ARGV[2] .. account_id
+if redis.call("GET", account_key) == ARGV[1] then
+    redis.call("DEL", account_key)
+end
+return account_id
+"""
+
+
+class AccountValidationRedis(RedisBase):
+    """keeps validation keys in redis instead of the `account_validations`
+    table, expiry is left to the native key TTL."""
+
+    @staticmethod
+    def _get_key(digest: str) -> str:
+        return f"validation-{digest}"
+
+    @staticmethod
+    def _get_account_key(account_id: int) -> str:
+        return f"validation-account-{account_id}"
+
+    async def create_account_validation(self, account_id: int) -> str:
+        validation_key = generate_account_validation_token()
+        digest = hash_account_validation_token(validation_key)
+        await self.redis.eval(
+            CREATE_VALIDATION_SCRIPT,
+            2,
+            self._get_account_key(account_id),
+            self._get_key(digest),
+            digest,
+            account_id,
+            settings.VALIDATION_KEY_TTL,
+            self._get_key(""),
+        )
+        return validation_key
+
+    async def fetch_account_validation(self, account_id: int) -> AccountValidation:
+        digest = await self.redis.get(self._get_account_key(account_id))
+
+        if not digest:
+            raise EntityDoesNotExist(f"no record with account_id `{account_id}` found!")
+
+        return AccountValidation(account_id=account_id, validation_key=digest)
+
+    async def delete_account_validation(self, validation_key: str) -> AccountValidation:
+        """read and delete the key inside one script, so two concurrent clicks
+        on the same link cannot both succeed."""
+        digest = hash_account_validation_token(validation_key)
+        account_id = await self.redis.eval(
+            CONSUME_VALIDATION_SCRIPT,
+            1,
+            self._get_key(digest),
+            digest,
+            self._get_account_key(""),
+        )
+
+        if not account_id:
+            raise EntityDoesNotExist("no record with the given validation_key found!")
+
+        return AccountValidation(account_id=int(account_id), validation_key=digest)
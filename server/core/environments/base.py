@@ -1,7 +1,9 @@
-from typing import Union
+from typing import Dict, List, Union
 
 from pydantic import BaseSettings, EmailStr, HttpUrl, RedisDsn
 
+from server.services.validators import TracingExporter, ValidationKeyStore
+
 
 class BaseConfig(BaseSettings):
     APP_NAME: str
@@ -14,12 +16,30 @@ class BaseConfig(BaseSettings):
     RDS_PASS: str
     RDS_NAME: str
 
+    # RDBMS connection pool configs
+    RDS_POOL_SIZE: int = 10
+    RDS_MAX_OVERFLOW: int = 5
+    RDS_POOL_TIMEOUT: int = 30
+    RDS_POOL_RECYCLE: int = 1800
+    RDS_POOL_PRE_PING: bool = True
+    RDS_STATEMENT_TIMEOUT: int = 30000
+
     REDIS_URL: RedisDsn
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: int = 5
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
+    ACCOUNT_CACHE_TTL: int = 300
+    ACCOUNT_MEMORY_CACHE_SIZE: int = 0
+    ACCOUNT_MEMORY_CACHE_TTL: float = 5.0
+    ACCOUNT_BULK_MAX_IDS: int = 500
 
     # password hashing config
     PASSWORD_HASH_ALGORITHM: str
     SALT_HASH_ALGORITHM: str
     HASH_SALT: str
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_QUEUE_DEPTH: int = 64
 
     # token config
     JWT_SECRET_KEY: str
@@ -29,6 +49,13 @@ class BaseConfig(BaseSettings):
     JWT_MIN: int
     JWT_HOUR: int
     JWT_DAY: int
+    JWT_CACHE_SIZE: int = 10000
+    JWT_KEYS_DIR: Union[str, None] = None
+    JWT_ACTIVE_KID: Union[str, None] = None
+    JWKS_MAX_AGE: int = 300
+    FORWARD_AUTH_CACHE_SIZE: int = 10000
+    FORWARD_AUTH_CACHE_TTL: float = 1.0
+    INTROSPECTION_CLIENTS: Dict[str, str] = {}
 
     # mail server config
     MAIL_USERNAME: Union[EmailStr, str]
@@ -40,6 +67,8 @@ class BaseConfig(BaseSettings):
     MAIL_STARTTLS: bool
     MAIL_SSL_TLS: bool
     USE_CREDENTIALS: bool
+    MAIL_POOL_SIZE: int = 4
+    MAIL_TIMEOUT: int = 60
 
     # random generator config
     RANDOM_BYTE_LENGTH: int
@@ -47,5 +76,39 @@ class BaseConfig(BaseSettings):
     PASSWORD_RESET_URL: HttpUrl
     EMAIL_CHANGE_URL: HttpUrl
 
+    # validation key config
+    VALIDATION_KEY_STORE: ValidationKeyStore = ValidationKeyStore.database
+    VALIDATION_KEY_TTL: int = 300
+    VALIDATION_SWEEP_ENABLED: bool = True
+    VALIDATION_SWEEP_INTERVAL: int = 60
+    VALIDATION_SWEEP_BATCH_SIZE: int = 1000
+
+    # background job config
+    JOB_STREAM: str = "jobs"
+    JOB_GROUP: str = "workers"
+    JOB_STREAM_MAX_LENGTH: int = 100000
+    JOB_CONCURRENCY: int = 10
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF: float = 2.0
+    JOB_RETRY_BACKOFF_MAX: float = 300.0
+    JOB_CLAIM_IDLE: int = 60
+
+    # request instrumentation config
+    SERVER_TIMING_ENABLED: bool = False
+    REQUEST_QUERY_BUDGET: int = 0
+    REQUEST_QUERY_TIME_BUDGET: float = 0
+
+    # tracing config
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_TRUST_PARENT_SAMPLING: bool = False
+    TRACING_EXPORTER: TracingExporter = TracingExporter.file
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FLUSH_INTERVAL: float = 5.0
+
+    # administration config
+    ADMIN_USERNAMES: List[str] = []
+
     class Config:
         env_file = ".env"
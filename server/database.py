@@ -1,8 +1,16 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Dict, Union
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from server.core.config import settings
+from server.services.metrics import Gauge, database_pool_checkout_wait, registry
+from server.services.timing import instrument_engine
+
+engine: Union[AsyncEngine, None] = None
+SessionLocal: Union[sessionmaker, None] = None
 
 
 def get_database_url():
@@ -15,19 +23,95 @@ def get_database_url():
     return url
 
 
-def get_database_session():
-    url = get_database_url()
-    engine = create_async_engine(url)
-    SessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """queue pool that records how long every checkout waited."""
+
+    def _do_get(self):
+        with database_pool_checkout_wait.time():
+            return super()._do_get()
+
+
+def create_database_engine() -> AsyncEngine:
+    """create the process wide engine, the connection pool behind it is shared
+    by every session handed out by `get_session`."""
+    engine = create_async_engine(
+        get_database_url(),
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.RDS_POOL_SIZE,
+        max_overflow=settings.RDS_MAX_OVERFLOW,
+        pool_timeout=settings.RDS_POOL_TIMEOUT,
+        pool_recycle=settings.RDS_POOL_RECYCLE,
+        pool_pre_ping=settings.RDS_POOL_PRE_PING,
+        connect_args={
+            "server_settings": {"statement_timeout": str(settings.RDS_STATEMENT_TIMEOUT)},
+        },
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def get_database_engine() -> AsyncEngine:
+    global engine, SessionLocal
+
+    if engine is None:
+        engine = create_database_engine()
+        SessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    return engine
+
+
+def get_database_session() -> sessionmaker:
+    get_database_engine()
     return SessionLocal
 
 
+async def connect_database() -> None:
+    get_database_engine()
+
+
+async def disconnect_database() -> None:
+    global engine, SessionLocal
+
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    SessionLocal = None
+
+
+def get_database_pool_status() -> Dict[str, int]:
+    """usage of the pool of the existing engine, all zero when there is none
+    yet or it was disposed so a scrape never creates one."""
+    if engine is None:
+        return {
+            "pool_size": 0,
+            "max_overflow": settings.RDS_MAX_OVERFLOW,
+            "checked_in": 0,
+            "checked_out": 0,
+            "overflow": 0,
+        }
+
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.RDS_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+for field in ("pool_size", "checked_in", "checked_out", "overflow"):
+    registry.register(
+        Gauge(
+            f"database_pool_{field}",
+            f"Current `{field}` of the database connection pool.",
+            function=lambda field=field: get_database_pool_status()[field],
+        ),
+    )
+
+
 async def get_session():
-    try:
-        session: AsyncSession = get_database_session()()
+    async with get_database_session()() as session:
         yield session
-    finally:
-        await session.close()
 
 
 Base = declarative_base()
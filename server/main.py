@@ -1,18 +1,59 @@
 from fastapi import FastAPI
 
+from server.cache.base import connect_redis, disconnect_redis
 from server.core.config import settings
+from server.database import connect_database, disconnect_database
 from server.docs.metadata import read_api_metadata, read_tags_metadata
 from server.routers.auth import router as auth_router
+from server.routers.meta import router as meta_router
 from server.routers.user import router as user_router
 from server.schemas.base import HealthResponse
+from server.security.pool import hashing_pool
+from server.services.metrics import MetricsMiddleware
+from server.services.responses import APIResponse
+from server.services.sweeper import validation_key_sweeper
+from server.services.timing import ServerTimingMiddleware
+from server.services.tracing import TracingMiddleware, tracer
+from server.services.validators import ValidationKeyStore
 
 app = FastAPI(
     **read_api_metadata(),
     openapi_tags=read_tags_metadata(),
+    default_response_class=APIResponse,
 )
 
+app.add_middleware(TracingMiddleware)
+app.add_middleware(
+    ServerTimingMiddleware,
+    enabled=settings.SERVER_TIMING_ENABLED,
+    query_budget=settings.REQUEST_QUERY_BUDGET,
+    time_budget=settings.REQUEST_QUERY_TIME_BUDGET,
+)
+app.add_middleware(MetricsMiddleware)
 app.include_router(user_router)
 app.include_router(auth_router)
+app.include_router(meta_router)
+
+
+@app.on_event("startup")
+async def startup():
+    await connect_database()
+    await connect_redis()
+    hashing_pool.start()
+    if tracer.enabled:
+        tracer.exporter.start()
+    if settings.VALIDATION_SWEEP_ENABLED and settings.VALIDATION_KEY_STORE == ValidationKeyStore.database:
+        validation_key_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await validation_key_sweeper.stop()
+    if tracer.enabled:
+        await tracer.exporter.stop()
+    await hashing_pool.shutdown()
+    await disconnect_redis()
+    await disconnect_database()
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -69,10 +69,11 @@ class AccountValidation(Base):
         unique=True,
         nullable=False,
     )
-    validation_key = Column(String(64), nullable=False)
+    validation_key = Column(String(64), unique=True, index=True, nullable=False)
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
         server_default=functions.now(),
     )
 
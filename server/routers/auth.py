@@ -1,43 +1,75 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, Path, Query, Request, status
+from typing import List, Union
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import EmailStr
 
 from server.cache.account import AccountRedis
+from server.cache.queue import JobQueue
+from server.cache.token import TokenRevocationRedis
 from server.core.config import settings
 from server.models.user import Account
 from server.schemas.account import (
     AccountInformationResponse,
+    AccountListResponse,
     AuthResponseSchema,
     MessageResponseSchema,
+    TokenIntrospectionRequest,
+    TokenIntrospectionResponse,
+    TokenIntrospectionSchema,
 )
+from server.schemas.token import JWTData
 from server.security.dependencies import (
+    AccountValidator,
     change_email_form,
+    decode_user_token,
     email_form_field,
+    forward_auth_cache,
     generate_crud_instance,
     generate_redis_client,
+    get_account_validator,
     get_current_active_user,
+    get_current_admin_user,
+    get_current_user,
+    get_introspection_client,
     new_password_form,
+    oauth2_scheme,
     password_form_field,
     phone_number_form_field,
     username_form_field,
 )
 from server.security.token import jwt_generator
-from server.services.email import send_email
+from server.services.email import enqueue_email
 from server.services.exceptions import (
-    EntityAlreadyExists,
     EntityDoesNotExist,
+    FieldAlreadyExists,
+    HashingPoolSaturated,
     PasswordDoesNotMatch,
     UserNotActive,
 )
+from server.services.formatters import decode_cursor, encode_cursor
 from server.services.messages import (
     http_exc_400_credentials_bad_signin_request,
     http_exc_400_credentials_bad_signup_request,
     http_exc_400_inactive_user,
+    http_exc_400_invalid_cursor,
     http_exc_404_key_expired,
     http_exc_404_not_found,
+    http_exc_422_too_many_items,
+    http_exc_503_service_unavailable,
 )
+from server.services.responses import APIResponse
 from server.services.validators import EmailTemplates, Tags
-from server.sql.user import AccountCRUD, AccountValidationCRUD
+from server.sql.user import AccountCRUD
 
 router = APIRouter(prefix="/auth", tags=[Tags.authentication])
 
@@ -50,33 +82,28 @@ router = APIRouter(prefix="/auth", tags=[Tags.authentication])
     status_code=status.HTTP_201_CREATED,
 )
 async def register_user(
-    request: Request,
-    task: BackgroundTasks,
     username: str = Depends(username_form_field),
     email: EmailStr = Depends(email_form_field),
     phone_number: str = Depends(phone_number_form_field),
     password: str = Depends(new_password_form),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    queue: JobQueue = Depends(generate_redis_client(JobQueue)),
 ):
     try:
-        await account.is_username_available(username=username)
-        await account.is_email_available(email=email)
-    except EntityAlreadyExists:
-        raise await http_exc_400_credentials_bad_signup_request()
-
-    new_user = await account.create_account(
-        username=username,
-        email=email,
-        phone_number=phone_number,
-        password=password,
-    )
+        new_user = await account.create_account(
+            username=username,
+            email=email,
+            phone_number=phone_number,
+            password=password,
+        )
+    except FieldAlreadyExists as error:
+        raise await http_exc_400_credentials_bad_signup_request(field=error.field)
+    except HashingPoolSaturated:
+        raise await http_exc_503_service_unavailable()
 
-    task.add_task(
-        send_email,
-        request=request,
+    await enqueue_email(
+        queue=queue,
         account=new_user,
-        validator=validator,
         base_url=settings.ACTIVATION_URL,
         template_name=EmailTemplates.account_activation,
         subject=f"Account activation for {new_user.username}",
@@ -96,6 +123,7 @@ async def signin(
     form_data: OAuth2PasswordRequestForm = Depends(),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
     redis: AccountRedis = Depends(generate_redis_client(AccountRedis)),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
 ):
     try:
         user = await account.authenticate_user(
@@ -108,13 +136,35 @@ async def signin(
         raise await http_exc_400_inactive_user()
     except PasswordDoesNotMatch:
         raise await http_exc_400_credentials_bad_signin_request()
+    except HashingPoolSaturated:
+        raise await http_exc_503_service_unavailable()
 
-    access_token = jwt_generator.generate_access_token(account=user)
+    generation = await revocations.get_generation(user.id)
+    access_token = jwt_generator.generate_access_token(account=user, generation=generation)
     await redis.set_account_data(user)
 
     return AuthResponseSchema(token_type="Bearer", access_token=access_token)
 
 
+@router.post(
+    "/signout",
+    name="auth:signout",
+    summary="Revoke the access token of the current user",
+    response_model=MessageResponseSchema,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(decode_user_token)],
+)
+async def signout(
+    token: str = Depends(oauth2_scheme),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
+):
+    await revocations.revoke_token(token)
+    jwt_generator.invalidate_token(token)
+    if forward_auth_cache is not None:
+        forward_auth_cache.delete(token)
+    return MessageResponseSchema(msg="Signed out successfully!")
+
+
 @router.get(
     "/activate-account/{validation_key}",
     name="auth:activation",
@@ -125,7 +175,7 @@ async def signin(
 async def activate_account(
     validation_key: str,
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    validator: AccountValidator = Depends(get_account_validator),
 ):
     try:
         account_to_activate = await validator.delete_account_validation(validation_key=validation_key)
@@ -135,6 +185,141 @@ async def activate_account(
     return MessageResponseSchema(msg="Your account has been activated")
 
 
+@router.get(
+    "/verify",
+    name="auth:verify",
+    summary="Forward authentication check for reverse proxies",
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Missing, invalid or inactive credentials"}},
+)
+async def verify_forward_auth(
+    request: Request,
+    account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
+    redis: AccountRedis = Depends(generate_redis_client(AccountRedis)),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
+):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return Response(status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+
+    identity = forward_auth_cache.get(token) if forward_auth_cache is not None else None
+    if identity is None:
+        try:
+            user_data = await decode_user_token(token=token, revocations=revocations)
+            user = await get_current_user(user_data=user_data, account=account, redis=redis)
+            user = await get_current_active_user(user=user)
+        except HTTPException:
+            return Response(status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+
+        identity = {"X-User-Id": str(user.id), "X-Username": user.username}
+        if forward_auth_cache is not None:
+            forward_auth_cache.set(token, identity)
+
+    return Response(status_code=status.HTTP_200_OK, headers=identity)
+
+
+@router.post(
+    "/introspect",
+    name="auth:introspect",
+    summary="Validate a batch of access tokens for gateways",
+    response_model=TokenIntrospectionResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_introspection_client)],
+)
+async def introspect_tokens(
+    payload: TokenIntrospectionRequest,
+    account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
+):
+    claims = []
+    for token in payload.tokens:
+        try:
+            claims.append(jwt_generator.retrieve_token_details(token))
+        except ValueError:
+            claims.append(None)
+
+    verified = [(token, user_data) for token, user_data in zip(payload.tokens, claims) if user_data]
+    revoked = await revocations.get_revoked(verified)
+    revoked_tokens = {token for (token, _), is_revoked in zip(verified, revoked) if is_revoked}
+    claims = [None if token in revoked_tokens else user_data for token, user_data in zip(payload.tokens, claims)]
+
+    account_ids = [user_data.id for user_data in claims if user_data]
+    users = {user.id: user for user in await account.read_many_accounts(account_ids)}
+
+    results = []
+    for user_data in claims:
+        user = users.get(user_data.id) if user_data else None
+        if user is None:
+            results.append(TokenIntrospectionSchema(valid=False))
+        else:
+            results.append(
+                TokenIntrospectionSchema(
+                    valid=True,
+                    claims=JWTData.construct_from_orm(user_data),
+                    is_active=user.is_active,
+                    is_verified=user.is_verified,
+                ),
+            )
+    return TokenIntrospectionResponse(results=results)
+
+
+@router.get(
+    "/accounts",
+    name="account:list",
+    summary="List accounts page by page for administrators",
+    response_model=AccountListResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def read_accounts(
+    cursor: Union[str, None] = Query(
+        default=None,
+        title="cursor",
+        description="Opaque cursor returned as `nextCursor` by the previous page.",
+    ),
+    page_size: int = Query(default=20, ge=1, le=100, alias="pageSize"),
+    is_active: Union[bool, None] = Query(default=None, alias="isActive"),
+    is_verified: Union[bool, None] = Query(default=None, alias="isVerified"),
+    account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
+):
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise await http_exc_400_invalid_cursor()
+
+    accounts, next_id = await account.read_accounts(
+        after_id=after_id,
+        page_size=page_size,
+        is_active=is_active,
+        is_verified=is_verified,
+    )
+    return AccountListResponse(
+        accounts=[AccountInformationResponse.from_orm(user) for user in accounts],
+        next_cursor=encode_cursor(next_id) if next_id is not None else None,
+    )
+
+
+@router.get(
+    "/accounts/bulk",
+    name="account:bulk-info",
+    summary="Fetch information about several users by their IDs",
+    response_model=List[AccountInformationResponse],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_active_user)],
+)
+async def read_accounts_by_ids(
+    ids: List[int] = Query(
+        title="user IDs",
+        description="IDs of the users to fetch, repeat the parameter for each ID.",
+    ),
+    account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
+):
+    if len(ids) > settings.ACCOUNT_BULK_MAX_IDS:
+        raise await http_exc_422_too_many_items("ids", settings.ACCOUNT_BULK_MAX_IDS)
+    return await account.read_many_accounts(ids)
+
+
 @router.get(
     "/{account_id}",
     name="account:info",
@@ -150,11 +335,10 @@ async def read_account_by_id(
     ),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
 ):
-    try:
-        user = await account.read_account_by_id(account_id)
-        return user
-    except EntityDoesNotExist:
+    users = await account.read_many_accounts([account_id])
+    if not users:
         raise await http_exc_404_not_found()
+    return APIResponse(users[0])
 
 
 @router.patch(
@@ -169,12 +353,17 @@ async def update_user_password(
     new_password: str = Depends(new_password_form),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
     current_user: Account = Depends(get_current_active_user),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
 ):
-    await account.update_password(
-        account_id=current_user.id,
-        current_password=current_password,
-        new_password=new_password,
-    )
+    try:
+        await account.update_password(
+            account_id=current_user.id,
+            current_password=current_password,
+            new_password=new_password,
+        )
+    except HashingPoolSaturated:
+        raise await http_exc_503_service_unavailable()
+    await revocations.revoke_account_tokens(current_user.id)
     return MessageResponseSchema(msg="Password updated successfully!")
 
 
@@ -186,19 +375,15 @@ async def update_user_password(
     status_code=status.HTTP_200_OK,
 )
 async def forgot_user_password(
-    request: Request,
-    task: BackgroundTasks,
     email: EmailStr = Depends(email_form_field),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    queue: JobQueue = Depends(generate_redis_client(JobQueue)),
 ):
     try:
         user = await account.read_account_by_email(email=email)
-        task.add_task(
-            send_email,
-            request=request,
+        await enqueue_email(
+            queue=queue,
             account=user,
-            validator=validator,
             base_url=settings.PASSWORD_RESET_URL,
             template_name=EmailTemplates.password_reset,
             subject=f"Password reset for {user.username}",
@@ -219,7 +404,8 @@ async def reset_user_password(
     validation_key: str,
     new_password: str = Depends(new_password_form),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    validator: AccountValidator = Depends(get_account_validator),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
 ):
     try:
         deleted_record = await validator.delete_account_validation(validation_key=validation_key)
@@ -227,9 +413,12 @@ async def reset_user_password(
             account_id=deleted_record.account_id,
             new_password=new_password,
         )
+        await revocations.revoke_account_tokens(deleted_record.account_id)
         return MessageResponseSchema(msg="Password was reset successfully!")
     except EntityDoesNotExist:
         raise await http_exc_404_key_expired()
+    except HashingPoolSaturated:
+        raise await http_exc_503_service_unavailable()
 
 
 @router.post(
@@ -240,17 +429,13 @@ async def reset_user_password(
     status_code=status.HTTP_200_OK,
 )
 async def change_account_email(
-    request: Request,
-    task: BackgroundTasks,
     new_email: EmailStr = Depends(change_email_form),
     current_user: Account = Depends(get_current_active_user),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    queue: JobQueue = Depends(generate_redis_client(JobQueue)),
 ):
-    task.add_task(
-        send_email,
-        request=request,
+    await enqueue_email(
+        queue=queue,
         account=current_user,
-        validator=validator,
         base_url=settings.EMAIL_CHANGE_URL,
         template_name=EmailTemplates.change_email,
         email=new_email,
@@ -271,7 +456,8 @@ async def update_account_email(
     validation_key: str = Path(),
     new_email: EmailStr = Query(alias="new-email"),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
-    validator: AccountValidationCRUD = Depends(generate_crud_instance(name=AccountValidationCRUD)),
+    validator: AccountValidator = Depends(get_account_validator),
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
 ):
     try:
         deleted_record = await validator.delete_account_validation(validation_key=validation_key)
@@ -279,6 +465,7 @@ async def update_account_email(
             account_id=deleted_record.account_id,
             new_email=new_email,
         )
+        await revocations.revoke_account_tokens(deleted_record.account_id)
         return MessageResponseSchema(msg="Email was updated successfully!")
     except EntityDoesNotExist:
         raise await http_exc_404_key_expired()
@@ -0,0 +1,65 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from server.cache.account import account_memory_cache
+from server.cache.memory import read_memory_cache_stats
+from server.core.config import settings
+from server.database import get_database_pool_status
+from server.schemas.base import CacheStatsResponse, DatabasePoolResponse
+from server.security.dependencies import forward_auth_cache
+from server.security.keys import jwt_key_ring
+from server.security.token import jwt_generator
+from server.services.metrics import registry
+from server.services.validators import Tags
+
+router = APIRouter()
+
+
+@router.get(
+    "/health/database",
+    name="health:database-pool",
+    summary="Connection pool usage of the current worker",
+    response_model=DatabasePoolResponse,
+    tags=[Tags.server_health],
+)
+async def database_pool_health():
+    return get_database_pool_status()
+
+
+@router.get(
+    "/health/cache",
+    name="health:cache",
+    summary="Hit, miss and eviction counters of the in-memory caches",
+    response_model=CacheStatsResponse,
+    tags=[Tags.server_health],
+)
+async def cache_health():
+    return {
+        "account": read_memory_cache_stats(account_memory_cache),
+        "token": read_memory_cache_stats(jwt_generator.cache),
+        "forward_auth": read_memory_cache_stats(forward_auth_cache),
+    }
+
+
+@router.get(
+    "/metrics",
+    name="health:metrics",
+    summary="Request, hashing, token, cache, database pool and email metrics in Prometheus format",
+    response_class=PlainTextResponse,
+    tags=[Tags.server_health],
+)
+async def read_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get(
+    "/.well-known/jwks.json",
+    name="auth:jwks",
+    summary="Public keys for verifying access tokens without calling this service",
+    tags=[Tags.authentication],
+)
+async def read_jwks():
+    return JSONResponse(
+        content=jwt_key_ring.jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"},
+    )
@@ -16,6 +16,7 @@ from server.security.dependencies import (
 )
 from server.services.exceptions import EntityAlreadyExists, EntityDoesNotExist
 from server.services.messages import http_exc_404_not_found, http_exc_409_conflict
+from server.services.responses import APIResponse
 from server.services.validators import Tags
 from server.sql.user import UserCRUD
 
@@ -71,10 +72,8 @@ async def read_this_user(
     current_user: Account = Depends(get_current_active_user),
 ):
     try:
-        print(f"{current_user.id = }")
         user = await user.read_user_by_account_id(current_user.id)
-        print(f"{user = }")
-        return user
+        return APIResponse(UserResponseSchema.construct_from_orm(user))
     except EntityDoesNotExist:
         raise await http_exc_404_not_found()
 
@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Union
+from typing import List, Union
 
 from pydantic import Field
 
-from server.schemas.base import BaseSchemaAuthAPI, BaseSchemaORM
+from server.schemas.base import BaseSchemaAPI, BaseSchemaAuthAPI, BaseSchemaORM
 from server.schemas.token import JWTData
 
 
@@ -46,3 +46,53 @@ class AccountInformationResponse(JWTData, BaseSchemaORM):
         title="time of last update",
         decription="Exact time when the user information was last updated.",
     )
+
+
+class AccountListResponse(BaseSchemaAPI):
+    accounts: List[AccountInformationResponse] = Field(
+        title="accounts",
+        decription="Accounts in the requested page ordered by ID.",
+    )
+    next_cursor: Union[str, None] = Field(
+        default=None,
+        title="next cursor",
+        decription="Opaque cursor to fetch the next page, empty on the last page.",
+    )
+
+
+class TokenIntrospectionRequest(BaseSchemaAPI):
+    tokens: List[str] = Field(
+        title="tokens",
+        decription="Access tokens to validate in one call.",
+        min_items=1,
+        max_items=100,
+    )
+
+
+class TokenIntrospectionSchema(BaseSchemaAPI):
+    valid: bool = Field(
+        title="token validity",
+        decription="Whether the token is correctly signed, unexpired and belongs to an existing account.",
+    )
+    claims: Union[JWTData, None] = Field(
+        default=None,
+        title="token claims",
+        decription="User data carried by the token, empty when the token is not valid.",
+    )
+    is_active: bool = Field(
+        default=False,
+        title="active status",
+        decription="Whether the account behind the token is active.",
+    )
+    is_verified: bool = Field(
+        default=False,
+        title="verification status",
+        decription="Whether the account behind the token is verified.",
+    )
+
+
+class TokenIntrospectionResponse(BaseSchemaAPI):
+    results: List[TokenIntrospectionSchema] = Field(
+        title="results",
+        decription="One result per token, in the order the tokens were sent.",
+    )
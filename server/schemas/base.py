@@ -17,6 +17,12 @@ class BaseSchemaORM(BaseModel):
         allow_population_by_field_name: bool = True
         json_encoders: dict = {datetime: format_datetime_into_isoformat}
 
+    @classmethod
+    def construct_from_orm(cls, obj: Any):
+        """build the schema from attributes that were already validated, e.g. a
+        row loaded from the database, without running validators."""
+        return cls.construct(**{name: getattr(obj, name) for name in cls.__fields__})
+
 
 class BaseSchemaAPI(BaseSchemaORM):
     class Config:
@@ -35,3 +41,26 @@ class HealthResponse(BaseSchemaAPI):
     APP_NAME: str
     MODE: str
     DEBUG: bool
+
+
+class DatabasePoolResponse(BaseSchemaAPI):
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
+class CacheStatsSchema(BaseSchemaAPI):
+    enabled: bool
+    size: int = 0
+    max_size: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheStatsResponse(BaseSchemaAPI):
+    account: CacheStatsSchema
+    token: CacheStatsSchema
+    forward_auth: CacheStatsSchema
@@ -0,0 +1,18 @@
+from typing import Dict
+
+from pydantic import BaseModel, EmailStr, HttpUrl
+
+from server.services.validators import EmailTemplates
+
+
+class EmailJob(BaseModel):
+    account_id: int
+    username: str
+    recipient: EmailStr
+    template_name: EmailTemplates
+    subject: str
+    base_url: HttpUrl
+    extras: Dict[str, str] = {}
+
+    class Config:
+        use_enum_values: bool = True
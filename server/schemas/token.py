@@ -32,6 +32,14 @@ class JWTData(BaseSchemaAPI):
     )
 
 
+class JWTClaims(JWTData):
+    generation: int = Field(
+        default=0,
+        title="token generation",
+        decription="Token generation of the account at signin, older generations are revoked.",
+    )
+
+
 class JWToken(BaseSchemaAPI):
     exp: datetime = Field(
         title="expiry of token",
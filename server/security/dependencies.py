@@ -1,34 +1,54 @@
+import secrets
 from datetime import datetime
 from typing import Callable, Type, Union
 
-import aioredis
 from aioredis.client import Redis
 from fastapi import Depends, Form
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.cache.account import AccountRedis
-from server.cache.base import RedisBase
+from server.cache.base import RedisBase, get_redis
+from server.cache.memory import MemoryCache
+from server.cache.token import TokenRevocationRedis
 from server.core.config import settings
 from server.database import get_session
 from server.models.user import Account
-from server.schemas.token import JWTData
+from server.schemas.token import JWTClaims, JWTData
 from server.security.token import jwt_generator
+from server.security.validation import AccountValidator, create_account_validator
 from server.services.exceptions import EntityAlreadyExists, EntityDoesNotExist
 from server.services.messages import (
     http_exc_400_credentials_bad_signup_request,
     http_exc_400_inactive_user,
     http_exc_400_unverified_user,
+    http_exc_401_revoked_token,
+    http_exc_401_unauthorized_client,
     http_exc_403_credentials_exception,
+    http_exc_403_forbidden_request,
     http_exc_412_value_mismatch,
     http_exc_422_field_required,
 )
+from server.services.tracing import traced
 from server.services.validators import Gender
 from server.sql.base import SQLBase
 from server.sql.user import AccountCRUD
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/signin")
+client_credentials_scheme = HTTPBasic(auto_error=False)
+
+
+def get_forward_auth_cache() -> Union[MemoryCache, None]:
+    if settings.FORWARD_AUTH_CACHE_SIZE <= 0:
+        return None
+    return MemoryCache(
+        max_size=settings.FORWARD_AUTH_CACHE_SIZE,
+        ttl=settings.FORWARD_AUTH_CACHE_TTL,
+    )
+
+
+forward_auth_cache: Union[MemoryCache, None] = get_forward_auth_cache()
 
 
 def generate_crud_instance(name: Type[SQLBase]) -> Callable[[], SQLBase]:
@@ -40,12 +60,8 @@ def generate_crud_instance(name: Type[SQLBase]) -> Callable[[], SQLBase]:
     return _create_crud_instance
 
 
-async def get_redis_client() -> Redis:
-    try:
-        redis = await aioredis.from_url(settings.REDIS_URL, decode_responses=True)
-        yield redis
-    finally:
-        await redis.close()
+def get_redis_client() -> Redis:
+    return get_redis()
 
 
 def generate_redis_client(name: Type[RedisBase]) -> Callable[[], RedisBase]:
@@ -57,30 +73,47 @@ def generate_redis_client(name: Type[RedisBase]) -> Callable[[], RedisBase]:
     return _create_redis_client
 
 
+def get_account_validator(
+    session: AsyncSession = Depends(get_session),
+) -> AccountValidator:
+    return create_account_validator(session=session)
+
+
+@traced("decode_user_token")
 async def decode_user_token(
     token: str = Depends(oauth2_scheme),
-) -> JWTData:
+    revocations: TokenRevocationRedis = Depends(generate_redis_client(TokenRevocationRedis)),
+) -> JWTClaims:
     try:
-        user_data: JWTData = jwt_generator.retrieve_token_details(token)
+        user_data: JWTClaims = jwt_generator.retrieve_token_details(token)
     except ValueError:
         raise await http_exc_403_credentials_exception()
+
+    if await revocations.is_revoked(token, user_data):
+        raise await http_exc_401_revoked_token()
     return user_data
 
 
+@traced("get_current_user")
 async def get_current_user(
     user_data: JWTData = Depends(decode_user_token),
     account: AccountCRUD = Depends(generate_crud_instance(name=AccountCRUD)),
     redis: AccountRedis = Depends(generate_redis_client(AccountRedis)),
 ):
+    user = await redis.get_account_data(user_data.id)
+    if user:
+        return user
+
     try:
-        user = await redis.get_account_data(user_data.id)
-        if not user:
-            user = await account.read_account_by_username(user_data.username)
+        user = await account.read_account_by_username(user_data.username)
     except EntityDoesNotExist:
         raise await http_exc_403_credentials_exception()
+
+    await redis.set_account_data(user)
     return user
 
 
+@traced("get_current_active_user")
 async def get_current_active_user(
     user: Account = Depends(get_current_user),
 ):
@@ -97,6 +130,25 @@ async def get_current_verified_user(
     return user
 
 
+async def get_current_admin_user(
+    user: Account = Depends(get_current_active_user),
+):
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise await http_exc_403_forbidden_request()
+    return user
+
+
+async def get_introspection_client(
+    credentials: Union[HTTPBasicCredentials, None] = Depends(client_credentials_scheme),
+) -> str:
+    """authenticate the gateway against `INTROSPECTION_CLIENTS` so token
+    introspection is not open to anyone holding a token."""
+    secret = settings.INTROSPECTION_CLIENTS.get(credentials.username) if credentials else None
+    if not secret or not secrets.compare_digest(credentials.password.encode(), secret.encode()):
+        raise await http_exc_401_unauthorized_client()
+    return credentials.username
+
+
 def username_form_field(
     username: str = Form(
         title="username",
@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from jose import jwk
+from jose.backends.base import Key
+
+from server.core.config import settings
+
+
+class JWTKeyRing:
+    """signing and verification keys for JWT.
+
+    HMAC algorithms keep using the shared `JWT_SECRET_KEY`. Asymmetric
+    algorithms (RS256, ES256, ...) read every `<kid>.pem` private key
+    from `JWT_KEYS_DIR`, sign with `JWT_ACTIVE_KID` and accept any key
+    in the directory, so a key is rotated by adding a new file,
+    switching the active kid and removing the old file once its tokens
+    expired.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        keys_dir: Union[str, None] = None,
+        active_kid: Union[str, None] = None,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self._keys: Dict[str, Key] = {}
+        self._active_kid: Union[str, None] = None
+
+        if self.is_symmetric:
+            return
+
+        if not keys_dir:
+            raise ValueError(f"JWT_KEYS_DIR is required for the {algorithm} algorithm!")
+
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            self._keys[path.stem] = jwk.construct(path.read_text(), algorithm)
+
+        if not self._keys:
+            raise ValueError(f"no private keys found in `{keys_dir}`!")
+
+        self._active_kid = active_kid or list(self._keys)[-1]
+        if self._active_kid not in self._keys:
+            raise ValueError(f"active key `{self._active_kid}` not found in `{keys_dir}`!")
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.upper().startswith("HS")
+
+    @property
+    def signing_key(self) -> Tuple[Union[str, None], Any]:
+        if self.is_symmetric:
+            return None, self.secret_key
+        return self._active_kid, self._keys[self._active_kid]
+
+    def get_verification_key(self, kid: Union[str, None]) -> Any:
+        if self.is_symmetric:
+            return self.secret_key
+        if kid not in self._keys:
+            raise ValueError(f"unknown key id `{kid}`")
+        return self._keys[kid].public_key()
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """public half of every key as a JWK set, empty for HMAC algorithms
+        since the shared secret must never be published."""
+        return {
+            "keys": [
+                {**key.public_key().to_dict(), "kid": kid, "use": "sig", "alg": self.algorithm}
+                for kid, key in self._keys.items()
+            ],
+        }
+
+
+def get_jwt_key_ring() -> JWTKeyRing:
+    return JWTKeyRing(
+        algorithm=settings.JWT_ALGORITHM,
+        secret_key=settings.JWT_SECRET_KEY,
+        keys_dir=settings.JWT_KEYS_DIR,
+        active_kid=settings.JWT_ACTIVE_KID,
+    )
+
+
+jwt_key_ring: JWTKeyRing = get_jwt_key_ring()
@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Union
+
+from server.core.config import settings
+from server.security.hash import hash_generator
+from server.services.exceptions import HashingPoolSaturated
+from server.services.metrics import (
+    Gauge,
+    password_hash_duration,
+    password_hash_rejections,
+    registry,
+)
+from server.services.timing import track
+
+
+def _generate_salt_hash() -> str:
+    return hash_generator.generate_salt_hash
+
+
+def _generate_password_hash(hash_salt: str, password: str) -> str:
+    return hash_generator.generate_password_hash(hash_salt=hash_salt, password=password)
+
+
+def _is_password_verified(password: str, hashed_password: str) -> bool:
+    return hash_generator.is_password_verified(password=password, hashed_password=hashed_password)
+
+
+class HashingPool:
+    def __init__(self, max_workers: int, queue_depth: int):
+        self._max_workers = max_workers
+        self._queue_depth = queue_depth
+        self._executor: Union[ProcessPoolExecutor, None] = None
+        self._pending: int = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+    async def shutdown(self) -> None:
+        """wait for the calls in flight from a thread, joining the worker
+        processes on the event loop would block it for a whole hash."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(executor.shutdown, wait=True, cancel_futures=True)
+            )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """run a CPU bound function in the worker processes, refuses new work
+        instead of queueing it once `queue_depth` calls are in flight."""
+        operation = func.__name__.lstrip("_")
+        if self._pending >= self._queue_depth:
+            password_hash_rejections.inc(operation=operation)
+            raise HashingPoolSaturated(f"{self._pending} hashing jobs are already in flight!")
+
+        self.start()
+        self._pending += 1
+        try:
+            with password_hash_duration.time(operation=operation), track("hash"):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool:
+            self._executor = None
+            raise
+        finally:
+            self._pending -= 1
+
+    async def generate_salt_hash(self) -> str:
+        return await self.run(_generate_salt_hash)
+
+    async def generate_password_hash(self, hash_salt: str, password: str) -> str:
+        return await self.run(_generate_password_hash, hash_salt, password)
+
+    async def is_password_verified(self, password: str, hashed_password: str) -> bool:
+        return await self.run(_is_password_verified, password, hashed_password)
+
+
+def get_hashing_pool() -> HashingPool:
+    return HashingPool(
+        max_workers=settings.HASH_POOL_WORKERS,
+        queue_depth=settings.HASH_POOL_QUEUE_DEPTH,
+    )
+
+
+hashing_pool: HashingPool = get_hashing_pool()
+
+registry.register(
+    Gauge("password_hash_pending", "Hashing calls currently in flight.", function=lambda: hashing_pool.pending),
+)
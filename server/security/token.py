@@ -1,4 +1,5 @@
 import hashlib
+import time
 from datetime import datetime, timedelta
 from random import randbytes
 from typing import Dict, Union
@@ -6,13 +7,20 @@ from typing import Dict, Union
 from jose import JWTError, jwt
 from pydantic import ValidationError
 
+from server.cache.memory import MemoryCache
 from server.core.config import settings
 from server.models.user import Account
-from server.schemas.token import JWTData, JWToken
+from server.schemas.token import JWTClaims, JWToken
+from server.security.keys import JWTKeyRing, jwt_key_ring
 from server.services.exceptions import EntityDoesNotExist
+from server.services.metrics import jwt_decode_duration
 
 
 class JWTGenerator:
+    def __init__(self, key_ring: Union[JWTKeyRing, None] = None, cache: Union[MemoryCache, None] = None):
+        self.key_ring = key_ring or jwt_key_ring
+        self.cache = cache
+
     def _generate_jwt(
         self,
         *,
@@ -27,41 +35,76 @@ class JWTGenerator:
             expire = datetime.utcnow() + timedelta(minutes=settings.JWT_MIN)
 
         to_encode.update(JWToken(exp=expire, sub=settings.JWT_SUBJECT).dict())
-        return jwt.encode(to_encode, key=settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+        kid, key = self.key_ring.signing_key
+        return jwt.encode(
+            to_encode,
+            key=key,
+            algorithm=self.key_ring.algorithm,
+            headers={"kid": kid} if kid else None,
+        )
 
-    def generate_access_token(self, account: Account) -> str:
+    def generate_access_token(self, account: Account, generation: int = 0) -> str:
+        """`generation` is the account's token generation at signin, tokens of
+        an older generation are refused once the account revokes them."""
         if not account:
             raise EntityDoesNotExist("cannot generate JWT for without Account entity!")
 
         return self._generate_jwt(
-            data=JWTData(
+            data=JWTClaims(
                 id=account.id,
                 username=account.username,
                 email=account.email,
                 phone_number=account.phone_number,
+                generation=generation,
             ).dict(),
             expires_delta=timedelta(minutes=settings.JWT_MIN),
         )
 
-    def retrieve_token_details(self, token: str) -> JWTData:
+    def retrieve_token_details(self, token: str) -> JWTClaims:
+        """decode and validate the token, verified tokens are remembered by
+        digest until they expire so repeated calls skip both steps."""
+        if self.cache is not None:
+            digest = hash_access_token(token)
+            jwt_data = self.cache.get(digest)
+            if jwt_data is not None:
+                return jwt_data
+
         try:
-            payload = jwt.decode(
-                token=token,
-                key=settings.JWT_SECRET_KEY,
-                algorithms=[settings.JWT_ALGORITHM],
-            )
-            jwt_data = JWTData(
+            with jwt_decode_duration.time():
+                kid = jwt.get_unverified_header(token).get("kid")
+                payload = jwt.decode(
+                    token=token,
+                    key=self.key_ring.get_verification_key(kid),
+                    algorithms=[self.key_ring.algorithm],
+                )
+            jwt_data = JWTClaims(
                 id=payload["id"],
                 username=payload["username"],
                 email=payload["email"],
                 phone_number=payload["phone_number"],
+                generation=payload.get("generation", 0),
             )
-        except JWTError as token_decode_error:
-            raise ValueError("unable to decode JWT") from token_decode_error
         except ValidationError as validation_error:
             raise ValueError("invalid payload in JWT") from validation_error
+        except (JWTError, ValueError) as token_decode_error:
+            raise ValueError("unable to decode JWT") from token_decode_error
+
+        if self.cache is not None:
+            ttl = payload["exp"] - time.time()
+            if ttl > 0:
+                self.cache.set(digest, jwt_data, ttl=ttl)
         return jwt_data
 
+    def invalidate_token(self, token: str) -> None:
+        """forget a cached verification, call it whenever a token is revoked
+        before its expiry."""
+        if self.cache is not None:
+            self.cache.delete(hash_access_token(token))
+
+
+def hash_access_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 
 def generate_account_validation_token() -> str:
     token = randbytes(settings.RANDOM_BYTE_LENGTH)
@@ -71,8 +114,16 @@ def generate_account_validation_token() -> str:
     return verification_code
 
 
+def hash_account_validation_token(validation_key: str) -> str:
+    """only this digest is stored, so a leaked table cannot be used to activate
+    accounts or reset passwords."""
+    return hashlib.sha256(validation_key.encode("utf-8")).hexdigest()
+
+
 def get_jwt_generator() -> JWTGenerator:
-    return JWTGenerator()
+    if settings.JWT_CACHE_SIZE <= 0:
+        return JWTGenerator()
+    return JWTGenerator(cache=MemoryCache(max_size=settings.JWT_CACHE_SIZE, ttl=settings.JWT_MIN * 60))
 
 
 jwt_generator: JWTGenerator = get_jwt_generator()
@@ -0,0 +1,18 @@
+from typing import Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.cache.validation import AccountValidationRedis
+from server.core.config import settings
+from server.services.validators import ValidationKeyStore
+from server.sql.user import AccountValidationCRUD
+
+AccountValidator = Union[AccountValidationCRUD, AccountValidationRedis]
+
+
+def create_account_validator(session: AsyncSession) -> AccountValidator:
+    """pick the store configured by `VALIDATION_KEY_STORE`, used by the API
+    dependency and by the email jobs of the worker."""
+    if settings.VALIDATION_KEY_STORE == ValidationKeyStore.redis:
+        return AccountValidationRedis()
+    return AccountValidationCRUD(session=session)
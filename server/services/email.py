@@ -1,72 +1,68 @@
-from typing import Dict
+from typing import Any, Dict
 
-from fastapi import Request
-from fastapi.templating import Jinja2Templates
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
 from pydantic import EmailStr, HttpUrl
 
-from server.core.config import settings
+from server.cache.queue import JobQueue
+from server.database import get_database_session
 from server.models.user import Account
-from server.sql.user import AccountValidationCRUD
+from server.schemas.job import EmailJob
+from server.security.validation import AccountValidator, create_account_validator
+from server.services.mailer import mail_sender
+from server.services.renderer import email_renderer
+from server.services.tracing import traced
+from server.services.validators import EmailTemplates
 
-templates = Jinja2Templates(directory="server/templates")
+SEND_EMAIL_JOB = "send_email"
 
 
-def get_mail_config():
-    conf = ConnectionConfig(
-        MAIL_USERNAME=settings.MAIL_USERNAME,
-        MAIL_PASSWORD=settings.MAIL_PASSWORD,
-        MAIL_FROM=settings.MAIL_FROM,
-        MAIL_PORT=settings.MAIL_PORT,
-        MAIL_SERVER=settings.MAIL_SERVER,
-        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-        MAIL_STARTTLS=settings.MAIL_STARTTLS,
-        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-        USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    )
-    return conf
-
-
-async def send_email(
-    request: Request,
+async def enqueue_email(
+    queue: JobQueue,
     account: Account,
-    validator: AccountValidationCRUD,
-    template_name: str,
+    template_name: EmailTemplates,
     subject: str,
     base_url: HttpUrl,
     email: EmailStr = None,
     extras: Dict[str, str] = {},
-):
-    account_validator = await validator.create_account_validation(account.id)
-    validation_key = account_validator.validation_key
-    url = f"{base_url}/{validation_key}"
+) -> str:
+    job = EmailJob(
+        account_id=account.id,
+        username=account.username,
+        recipient=email or account.email,
+        template_name=template_name,
+        subject=subject,
+        base_url=base_url,
+        extras=extras,
+    )
+    return await queue.enqueue(SEND_EMAIL_JOB, job.dict())
 
-    if extras:
-        for key, value in extras.items():
+
+@traced("send_email")
+async def send_email(job: EmailJob, validator: AccountValidator):
+    validation_key = await validator.create_account_validation(job.account_id)
+    url = f"{job.base_url}/{validation_key}"
+
+    if job.extras:
+        for key, value in job.extras.items():
             url = f"{url}?{key}={value}"
 
-    template = templates.TemplateResponse(
-        f"{template_name}.html",
+    rendered = email_renderer.render(
+        job.template_name,
         {
-            "request": request,
-            "subject": subject,
+            "subject": job.subject,
             "url": url,
-            "username": account.username,
+            "username": job.username,
         },
     )
 
-    if email:
-        recipients = [email]
-    else:
-        recipients = [account.email]
-
-    html = template.body.decode("utf-8")
-    message = MessageSchema(
-        subject=subject,
-        recipients=recipients,
-        body=html,
-        subtype=MessageType.html,
+    message = mail_sender.build_message(
+        subject=job.subject,
+        recipients=[job.recipient],
+        html=rendered.html,
+        text=rendered.text,
     )
+    await mail_sender.send(message)
+
 
-    mailing_agent = FastMail(get_mail_config())
-    await mailing_agent.send_message(message)
+async def handle_email_job(payload: Dict[str, Any]):
+    async with get_database_session()() as session:
+        await send_email(job=EmailJob.parse_obj(payload), validator=create_account_validator(session=session))
@@ -6,6 +6,15 @@ class EntityAlreadyExists(Exception):
     """throw an exception when the data already exist in the database."""
 
 
+class FieldAlreadyExists(EntityAlreadyExists):
+    """throw an exception when a unique column of the data already exist in the
+    database, `field` names the column that collided."""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+
+
 class PasswordDoesNotMatch(Exception):
     """throw an exception when the account password does not match the
     entitiy's hashed password from the database."""
@@ -14,3 +23,8 @@ class PasswordDoesNotMatch(Exception):
 class UserNotActive(Exception):
     """throw an exception when the account has not been activated through
     email."""
+
+
+class HashingPoolSaturated(Exception):
+    """throw an exception when too many password hashing jobs are already
+    waiting for a worker process."""
@@ -1,4 +1,8 @@
+import base64
+import binascii
+import json
 from datetime import datetime, timezone
+from functools import lru_cache
 
 from pydash import camel_case
 
@@ -7,5 +11,28 @@ def format_datetime_into_isoformat(timestamp: datetime) -> str:
     return timestamp.replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def parse_isoformat(timestamp: str) -> datetime:
+    """inverse of `format_datetime_into_isoformat`."""
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+@lru_cache(maxsize=1024)
 def format_dict_key_to_camel_case(key: str) -> str:
     return camel_case(key)
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["id"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as decode_error:
+        raise ValueError("invalid pagination cursor") from decode_error
+
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("invalid pagination cursor")
+    return last_id
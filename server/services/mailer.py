@@ -0,0 +1,125 @@
+import asyncio
+from email.message import EmailMessage
+from email.utils import formataddr, getaddresses
+from typing import List, Union
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+
+from server.core.config import settings
+from server.services.metrics import email_send_outcomes
+from server.services.tracing import tracer
+
+reconnect_errors = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError)
+
+
+def get_mail_config():
+    conf = ConnectionConfig(
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+        MAIL_STARTTLS=settings.MAIL_STARTTLS,
+        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+        USE_CREDENTIALS=settings.USE_CREDENTIALS,
+        TIMEOUT=settings.MAIL_TIMEOUT,
+    )
+    return conf
+
+
+class MailSender:
+    """keeps up to `pool_size` authenticated SMTP connections open for the
+    lifetime of the app, so STARTTLS and login happen once per connection
+    instead of once per email, `pool_size` also caps concurrent sends."""
+
+    def __init__(self, config: ConnectionConfig, pool_size: int):
+        self.config = config
+        self.pool_size = pool_size
+        self.idle: List[aiosmtplib.SMTP] = []
+        self.semaphore: Union[asyncio.Semaphore, None] = None
+
+    async def connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        try:
+            await smtp.connect()
+            if self.config.USE_CREDENTIALS:
+                await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def build_message(self, subject: str, recipients: List[str], html: str, text: str = None) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = formataddr((self.config.MAIL_FROM_NAME, self.config.MAIL_FROM))
+        message["To"] = ", ".join(recipients)
+        if text:
+            message.set_content(text)
+            message.add_alternative(html, subtype="html")
+        else:
+            message.set_content(html, subtype="html")
+        return message
+
+    async def send(self, message: EmailMessage) -> None:
+        if self.config.SUPPRESS_SEND:
+            email_send_outcomes.inc(outcome="suppressed")
+            return
+        if self.semaphore is None:
+            self.start()
+
+        async with self.semaphore:
+            with tracer.span("smtp send", recipients=len(getaddresses([message["To"]]))):
+                await self._send(message)
+
+    async def _send(self, message: EmailMessage) -> None:
+        smtp = self.idle.pop() if self.idle else None
+        if smtp is not None and not smtp.is_connected:
+            smtp = None
+        try:
+            if smtp is not None:
+                try:
+                    await smtp.send_message(message)
+                except reconnect_errors:
+                    # the relay dropped the pooled connection, retry once on a fresh one
+                    email_send_outcomes.inc(outcome="reconnected")
+                    smtp.close()
+                    smtp = None
+            if smtp is None:
+                smtp = await self.connect()
+                await smtp.send_message(message)
+        except Exception:
+            email_send_outcomes.inc(outcome="failed")
+            raise
+        else:
+            email_send_outcomes.inc(outcome="sent")
+        finally:
+            if smtp is not None and smtp.is_connected:
+                self.idle.append(smtp)
+
+    def start(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.pool_size)
+
+    async def stop(self) -> None:
+        while self.idle:
+            smtp = self.idle.pop()
+            try:
+                await smtp.quit()
+            except (aiosmtplib.SMTPException, ConnectionError):
+                smtp.close()
+
+
+def get_mail_sender() -> MailSender:
+    return MailSender(config=get_mail_config(), pool_size=settings.MAIL_POOL_SIZE)
+
+
+mail_sender: MailSender = get_mail_sender()
@@ -1,10 +1,15 @@
+from typing import Union
+
 from fastapi import HTTPException, status
 
 
-async def http_exc_400_credentials_bad_signup_request() -> Exception:
+async def http_exc_400_credentials_bad_signup_request(field: Union[str, None] = None) -> Exception:
+    detail = {"msg": "Signup failed! Recheck all your credentials!"}
+    if field:
+        detail["field"] = field
     return HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
-        detail={"msg": "Signup failed! Recheck all your credentials!"},
+        detail=detail,
     )
 
 
@@ -15,6 +20,13 @@ async def http_exc_400_credentials_bad_signin_request() -> Exception:
     )
 
 
+async def http_exc_400_invalid_cursor() -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"msg": "Invalid pagination cursor! Use the cursor from the previous page."},
+    )
+
+
 async def http_exc_400_inactive_user() -> Exception:
     return HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
@@ -29,6 +41,22 @@ async def http_exc_400_unverified_user() -> Exception:
     )
 
 
+async def http_exc_401_unauthorized_client() -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={"msg": "Client authentication failed! Recheck the client credentials!"},
+        headers={"WWW-Authenticate": "Basic"},
+    )
+
+
+async def http_exc_401_revoked_token() -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={"msg": "Token has been revoked! Please sign in again."},
+        headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+    )
+
+
 async def http_exc_403_credentials_exception() -> Exception:
     return HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -77,3 +105,18 @@ async def http_exc_422_field_required(field_name: str) -> Exception:
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         detail={"msg": f"{field_name} is required."},
     )
+
+
+async def http_exc_503_service_unavailable() -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"msg": "Server is busy! Please try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def http_exc_422_too_many_items(field_name: str, limit: int) -> Exception:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={"msg": f"{field_name} accepts at most {limit} items."},
+    )
@@ -0,0 +1,244 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    """base of the in-process metrics, updates are plain dictionary and float
+    operations on the event loop thread so they never block it."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _get_label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self.values[self._get_label_values(labels)] += amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._get_label_values(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+            for values, value in self.values.items()
+        ]
+
+
+class Gauge(Metric):
+    """value read from `function` at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.function())}"]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels: str) -> None:
+        label_values = self._get_label_values(labels)
+        counts = self.counts.get(label_values)
+        if counts is None:
+            counts = self.counts[label_values] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[label_values] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def get_count(self, **labels: str) -> int:
+        return sum(self.counts.get(self._get_label_values(labels), ()))
+
+    def samples(self) -> List[str]:
+        lines = []
+        for values, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels((*self.labelnames, "le"), (*values, le))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self.sums[values])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """all metrics in the Prometheus text exposition format."""
+        lines = [line for metric in self.metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time spent handling a request, by route name.",
+        labelnames=("route", "method", "status"),
+    ),
+)
+password_hash_duration = registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "Time spent in the hashing pool, including the wait for a free process.",
+        labelnames=("operation",),
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0),
+    ),
+)
+password_hash_rejections = registry.register(
+    Counter(
+        "password_hash_rejections_total",
+        "Hashing calls refused because the pool was saturated.",
+        labelnames=("operation",),
+    ),
+)
+jwt_decode_duration = registry.register(
+    Histogram(
+        "jwt_decode_duration_seconds",
+        "Time spent verifying and decoding access tokens that were not cached.",
+        buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+    ),
+)
+account_cache_requests = registry.register(
+    Counter(
+        "account_cache_requests_total",
+        "Account cache lookups, by tier and result.",
+        labelnames=("tier", "result"),
+    ),
+)
+database_pool_checkout_wait = registry.register(
+    Histogram(
+        "database_pool_checkout_wait_seconds",
+        "Time spent waiting for a connection from the database pool.",
+    ),
+)
+email_send_outcomes = registry.register(
+    Counter(
+        "email_send_total",
+        "Emails handed to the SMTP relay by outcome, `reconnected` counts retries on a fresh connection.",
+        labelnames=("outcome",),
+    ),
+)
+
+
+def get_route_name(scope: Dict, route_names: Dict[Callable, str]) -> str:
+    """name of the route that handled the request, looked up by endpoint in
+    `route_names` which is filled from the app routes on first use."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in route_names:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is not None:
+                route_names[route.endpoint] = route.name
+    return route_names.get(endpoint, "unmatched")
+
+
+class MetricsMiddleware:
+    """record the duration of every request under the name of the route that
+    handled it, so path parameters do not multiply the series."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+        self.route_names: Dict[Callable, str] = {}
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                route=get_route_name(scope, self.route_names),
+                method=scope["method"],
+                status=str(status_code),
+            )
@@ -0,0 +1,43 @@
+from typing import Any, Dict, NamedTuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from server.services.validators import EmailTemplates
+
+
+class RenderedEmail(NamedTuple):
+    html: str
+    text: str
+
+
+class EmailRenderer:
+    """compiles every email template once and renders them to strings, so
+    emails can be rendered without a request or a response object."""
+
+    def __init__(self, directory: str):
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+        )
+        self.templates: Dict[str, Dict[str, Template]] = {}
+
+    def load(self) -> None:
+        for template in EmailTemplates:
+            self.templates[template.value] = {
+                "html": self.environment.get_template(f"{template.value}.html"),
+                "text": self.environment.get_template(f"{template.value}.txt"),
+            }
+
+    def render(self, template_name: str, context: Dict[str, Any]) -> RenderedEmail:
+        if not self.templates:
+            self.load()
+
+        compiled = self.templates[template_name]
+        return RenderedEmail(html=compiled["html"].render(context), text=compiled["text"].render(context))
+
+
+def get_email_renderer() -> EmailRenderer:
+    return EmailRenderer(directory="server/templates")
+
+
+email_renderer: EmailRenderer = get_email_renderer()
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from server.services.formatters import format_datetime_into_isoformat
+
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return format_datetime_into_isoformat(value)
+    if isinstance(value, BaseModel):
+        return value.dict(by_alias=True)
+    raise TypeError(f"type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content: Any) -> bytes:
+    """serialize with orjson, datetimes keep the `Z` suffixed format of the
+    schemas' `json_encoders`."""
+    return orjson.dumps(content, default=orjson_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+class APIResponse(ORJSONResponse):
+    """default response class of the app.
+
+    Routes may return a schema instance wrapped in it to skip FastAPI's
+    re-validation and `jsonable_encoder` pass, the schema is serialized
+    by alias.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Union
+
+from server.core.config import settings
+from server.database import get_database_session
+from server.sql.user import AccountValidationCRUD
+
+logger = logging.getLogger(__name__)
+
+
+class ValidationKeySweeper:
+    def __init__(self, interval: int, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_purged: int = 0
+        self.total_purged: int = 0
+        self._task: Union[asyncio.Task, None] = None
+
+    async def sweep(self) -> int:
+        """delete expired validation keys batch by batch until a batch comes
+        back short, so one run never holds a long lock on the table."""
+        purged = 0
+        async with get_database_session()() as session:
+            validator = AccountValidationCRUD(session=session)
+            while True:
+                deleted = await validator.delete_expired_account_validations(batch_size=self.batch_size)
+                purged += deleted
+                if deleted < self.batch_size:
+                    break
+
+        self.last_purged = purged
+        self.total_purged += purged
+        logger.info("purged %d expired account validations", purged)
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("failed to purge expired account validations")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+def get_validation_key_sweeper() -> ValidationKeySweeper:
+    return ValidationKeySweeper(
+        interval=settings.VALIDATION_SWEEP_INTERVAL,
+        batch_size=settings.VALIDATION_SWEEP_BATCH_SIZE,
+    )
+
+
+validation_key_sweeper: ValidationKeySweeper = get_validation_key_sweeper()
@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from server.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTiming:
+    """time spent per dependency while handling one request."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {"db": 0.0, "cache": 0.0, "hash": 0.0}
+        self.counts: Dict[str, int] = {"db": 0, "cache": 0, "hash": 0}
+        self.statements: Counter = Counter()
+
+    def add(self, kind: str, duration: float) -> None:
+        self.durations[kind] += duration
+        self.counts[kind] += 1
+
+    def get_server_timing(self, exclude: Iterable[str] = ()) -> str:
+        descriptions = {"db": "queries", "cache": "cache calls", "hash": "hashes"}
+        return ", ".join(
+            f'{kind};dur={self.durations[kind] * 1000:.2f};desc="{self.counts[kind]} {descriptions[kind]}"'
+            for kind in self.durations
+            if self.counts[kind] and kind not in exclude
+        )
+
+
+request_timing: ContextVar[Union[RequestTiming, None]] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def track(kind: str) -> Iterator[None]:
+    """add the duration of the block to the current request, if any."""
+    timing = request_timing.get()
+    if timing is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(kind, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append((time.perf_counter(), time.time_ns()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started, started_ns = conn.info["query_started"].pop()
+    tracer.add_span("db.query", started_ns, time.time_ns(), **{"db.statement": statement})
+    timing = request_timing.get()
+    if timing is not None:
+        timing.add("db", time.perf_counter() - started)
+        timing.statements[statement] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """count and time every statement executed through the engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ServerTimingMiddleware:
+    """collect database, cache and hashing time of every request, report it in
+    the `Server-Timing` response header when `enabled` and log requests that go
+    over the query count or time budget.
+
+    Hashing time is never reported under `hash_hidden_prefixes`, on the
+    authentication routes it tells whether a password was checked and so
+    whether the username exists.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        enabled: bool = False,
+        query_budget: int = 0,
+        time_budget: float = 0,
+        hash_hidden_prefixes: Tuple[str, ...] = ("/auth",),
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.query_budget = query_budget
+        self.time_budget = time_budget
+        self.hash_hidden_prefixes = hash_hidden_prefixes
+
+    def check_budget(self, scope: Dict, timing: RequestTiming) -> None:
+        queries = timing.counts["db"]
+        query_time = timing.durations["db"] * 1000
+        over_count = self.query_budget and queries > self.query_budget
+        over_time = self.time_budget and query_time > self.time_budget
+        if not (over_count or over_time):
+            return
+
+        statement, repeats = timing.statements.most_common(1)[0]
+        logger.warning(
+            "%s %s ran %d queries in %.2fms, the most repeated one %d times: %s",
+            scope["method"],
+            scope["path"],
+            queries,
+            query_time,
+            repeats,
+            " ".join(statement.split()),
+        )
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not (self.enabled or self.query_budget or self.time_budget):
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = request_timing.set(timing)
+        exclude = ("hash",) if scope["path"].startswith(self.hash_hidden_prefixes) else ()
+
+        async def send_wrapper(message: Dict) -> None:
+            if self.enabled and message["type"] == "http.response.start":
+                header = timing.get_server_timing(exclude=exclude)
+                if header:
+                    headers: List = list(message.get("headers", []))
+                    headers.append((b"server-timing", header.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timing.reset(token)
+            self.check_budget(scope, timing)
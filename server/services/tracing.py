@@ -0,0 +1,354 @@
+import asyncio
+import functools
+import json
+import logging
+import random
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+import httpx
+
+from server.core.config import settings
+from server.services.metrics import get_route_name
+from server.services.validators import TracingExporter
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "start", "end", "error")
+
+    def __init__(self, trace_id: str, parent_id: Union[str, None], name: str, kind: int = 1):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.start = time.time_ns()
+        self.end = 0
+        self.error: Union[str, None] = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [{"key": key, "value": _to_otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _to_otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: ContextVar[Union[Span, None]] = ContextVar("current_span", default=None)
+
+
+class SpanExporter:
+    """buffer finished spans and write them out in OTLP/JSON batches from a
+    background task, so finishing a span never waits on I/O."""
+
+    def __init__(self, service_name: str, flush_interval: float, max_buffer: int = 10000):
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.buffer: List[Span] = []
+        self.dropped: int = 0
+        self._task: Union[asyncio.Task, None] = None
+
+    def add(self, span: Span) -> None:
+        if len(self.buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self.buffer.append(span)
+
+    def get_payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}],
+                    },
+                    "scopeSpans": [{"scope": {"name": "server"}, "spans": [span.to_otlp() for span in spans]}],
+                },
+            ],
+        }
+
+    async def export(self, payload: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> int:
+        spans, self.buffer = self.buffer, []
+        if spans:
+            await self.export(self.get_payload(spans))
+        return len(spans)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("failed to export spans")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """append one OTLP/JSON request body per line, a collector can replay the
+    file later."""
+
+    def __init__(self, path: str, service_name: str, flush_interval: float):
+        super().__init__(service_name=service_name, flush_interval=flush_interval)
+        self.path = path
+
+    def _write(self, line: str) -> None:
+        with open(self.path, "a") as output:
+            output.write(line + "\n")
+
+    async def export(self, payload: Dict[str, Any]) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._write, json.dumps(payload))
+
+
+class OTLPSpanExporter(SpanExporter):
+    """post batches to an OTLP/HTTP collector, e.g.
+    `http://localhost:4318/v1/traces`."""
+
+    def __init__(self, endpoint: str, service_name: str, flush_interval: float):
+        super().__init__(service_name=service_name, flush_interval=flush_interval)
+        self.endpoint = endpoint
+
+    async def export(self, payload: Dict[str, Any]) -> None:
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.post(self.endpoint, json=payload)
+            response.raise_for_status()
+
+
+class Tracer:
+    """decides at the root of a trace whether it is sampled, spans of a trace
+    that was sampled out cost a single context variable lookup."""
+
+    def __init__(
+        self,
+        exporter: Union[SpanExporter, None],
+        sample_rate: float,
+        trust_parent_sampling: bool = False,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.trust_parent_sampling = trust_parent_sampling
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def sample(self, traceparent: Union[str, None] = None) -> Union[Tuple[str, Union[str, None]], None]:
+        """decide whether a new root span is recorded and return its trace id
+        and parent span id, or None when it is sampled out.
+
+        A valid W3C `traceparent` continues the caller's trace, its
+        sampled flag is only followed with `trust_parent_sampling` so
+        clients cannot force every request to be recorded.
+        """
+        if not self.enabled:
+            return None
+
+        match = TRACEPARENT_PATTERN.match(traceparent or "")
+        if match and self.trust_parent_sampling:
+            sampled = int(match.group(3), 16) & 1
+        else:
+            sampled = random.random() < self.sample_rate
+
+        if not sampled:
+            return None
+        return match.group(1, 2) if match else (secrets.token_hex(16), None)
+
+    @contextmanager
+    def start_trace(
+        self,
+        name: str,
+        traceparent: Union[str, None] = None,
+        kind: int = 2,
+    ) -> Iterator[Union[Span, None]]:
+        """open the root span of a request or a job, see `sample`."""
+        context = self.sample(traceparent)
+        if context is None:
+            yield None
+            return
+
+        with self.record(Span(*context, name, kind)) as span:
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Union[Span, None]]:
+        parent = current_span.get()
+        if parent is None:
+            yield None
+            return
+
+        span = Span(parent.trace_id, parent.span_id, name)
+        span.attributes.update(attributes)
+        with self.record(span):
+            yield span
+
+    def add_span(self, name: str, start: int, end: int, **attributes: Any) -> None:
+        """record an already finished child span, for code that cannot be
+        wrapped in a context manager such as engine event hooks."""
+        parent = current_span.get()
+        if parent is None:
+            return
+
+        span = Span(parent.trace_id, parent.span_id, name)
+        span.start, span.end = start, end
+        span.attributes.update(attributes)
+        self.exporter.add(span)
+
+    @contextmanager
+    def record(self, span: Span) -> Iterator[Span]:
+        """make `span` the current span while the block runs and export it when
+        the block exits, for roots whose sampling was decided with `sample`."""
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.error = repr(error)
+            raise
+        finally:
+            current_span.reset(token)
+            span.end = time.time_ns()
+            self.exporter.add(span)
+
+
+def get_span_exporter() -> Union[SpanExporter, None]:
+    if not settings.TRACING_ENABLED:
+        return None
+    if settings.TRACING_EXPORTER == TracingExporter.otlp:
+        return OTLPSpanExporter(
+            endpoint=settings.TRACING_OTLP_ENDPOINT,
+            service_name=settings.APP_NAME,
+            flush_interval=settings.TRACING_FLUSH_INTERVAL,
+        )
+    return FileSpanExporter(
+        path=settings.TRACING_FILE_PATH,
+        service_name=settings.APP_NAME,
+        flush_interval=settings.TRACING_FLUSH_INTERVAL,
+    )
+
+
+def get_tracer() -> Tracer:
+    return Tracer(
+        exporter=get_span_exporter(),
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        trust_parent_sampling=settings.TRACING_TRUST_PARENT_SAMPLING,
+    )
+
+
+tracer: Tracer = get_tracer()
+
+
+def traced(name: str) -> Callable:
+    """wrap a coroutine function in a child span named `name`, functions are
+    left untouched when tracing is disabled."""
+
+    def decorator(function: Callable) -> Callable:
+        if not tracer.enabled:
+            return function
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return await function(*args, **kwargs)
+            with tracer.span(name):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_public_methods(cls: type) -> None:
+    """wrap every public coroutine method defined on `cls` in a span named
+    `<class>.<method>`, used by the SQL and redis base classes."""
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith("_") and asyncio.iscoroutinefunction(value):
+            setattr(cls, attribute, traced(f"{cls.__name__}.{attribute}")(value))
+
+
+class TracingMiddleware:
+    """open the root span of every sampled request, named after its route."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+        self.route_names: Dict[Callable, str] = {}
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        # sampled out requests skip the context managers entirely
+        context = tracer.sample(traceparent)
+        if context is None:
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.record(Span(*context, f"{scope['method']} {scope['path']}", kind=2)) as span:
+            status_code = 500
+
+            async def send_wrapper(message: Dict) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = get_route_name(scope, self.route_names)
+                span.name = f"{scope['method']} {route}"
+                span.attributes.update(
+                    {
+                        "http.method": scope["method"],
+                        "http.route": route,
+                        "http.target": scope["path"],
+                        "http.status_code": status_code,
+                    },
+                )
@@ -16,3 +16,13 @@ class EmailTemplates(str, Enum):
     account_activation = "account-activation"
     change_email = "change-email"
     password_reset = "password-reset"  # pragma: allowlist secret
+
+
+class TracingExporter(str, Enum):
+    file = "file"
+    otlp = "otlp"
+
+
+class ValidationKeyStore(str, Enum):
+    database = "database"
+    redis = "redis"
@@ -1,6 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.services.tracing import trace_public_methods
+
 
 class SQLBase:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_public_methods(cls)
+
     def __init__(self, session: AsyncSession):
         self.session = session
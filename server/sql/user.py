@@ -1,24 +1,62 @@
 from datetime import datetime, timedelta
-from typing import Sequence, Union
+from typing import Iterable, List, Sequence, Tuple, Union
 
 from pydantic import EmailStr
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import Integer, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.cache.account import AccountRedis
+from server.core.config import settings
 from server.models.user import Account, AccountValidation, User
+from server.schemas.account import AccountInformationResponse
 from server.schemas.user import UserUpdateSchema
 from server.security.password import pwd_generator
-from server.security.token import generate_account_validation_token
+from server.security.token import (
+    generate_account_validation_token,
+    hash_account_validation_token,
+)
 from server.services.exceptions import (
     EntityAlreadyExists,
     EntityDoesNotExist,
+    FieldAlreadyExists,
     PasswordDoesNotMatch,
     UserNotActive,
 )
 from server.sql.base import SQLBase
 
+account_information_columns = (
+    Account.id,
+    Account.username,
+    Account.email,
+    Account.phone_number,
+    Account.is_active,
+    Account.is_verified,
+    Account.created_at,
+    Account.updated_at,
+)
+
+account_unique_fields = ("username", "email", "phone_number")
+
+
+def get_violated_unique_field(error: IntegrityError) -> str:
+    """name the account column whose unique index rejected the insert, read
+    from the constraint name reported by asyncpg."""
+    constraint_name = getattr(error.orig.__cause__, "constraint_name", None) or str(error.orig)
+
+    for field in account_unique_fields:
+        if f"ix_accounts_{field}" in constraint_name:
+            return field
+    return "account"
+
 
 class AccountCRUD(SQLBase):
+    def __init__(self, session: AsyncSession, cache: Union[AccountRedis, None] = None):
+        super().__init__(session=session)
+        self.cache = cache or AccountRedis()
+
     async def create_account(
         self,
         username: str,
@@ -26,26 +64,61 @@ class AccountCRUD(SQLBase):
         phone_number: str,
         password: str,
     ) -> Account:
-        new_account = Account(
+        """insert the account with a single INSERT RETURNING, relying on the
+        unique indexes instead of checking availability beforehand so
+        concurrent signups for the same name cannot both pass."""
+        hash_salt = await pwd_generator.generate_salt()
+        hashed_password = await pwd_generator.generate_hashed_password(
+            hash_salt=hash_salt,
+            password=password,
+        )
+
+        insert_stmt = insert(Account).values(
             username=username,
             email=email,
             phone_number=phone_number,
+            hash_salt=hash_salt,
+            hashed_password=hashed_password,
         )
-        new_account.hash_salt = pwd_generator.generate_salt
-        new_account.hashed_password = pwd_generator.generate_hashed_password(
-            hash_salt=new_account.hash_salt,
-            password=password,
-        )
+        stmt = select(Account).from_statement(insert_stmt.returning(*Account.__table__.columns))
 
-        self.session.add(new_account)
-        await self.session.commit()
-        await self.session.refresh(instance=new_account)
-        return new_account
+        try:
+            query = await self.session.execute(statement=stmt)
+            new_account = query.scalar()
+            await self.session.commit()
+        except IntegrityError as integrity_error:
+            await self.session.rollback()
+            field = get_violated_unique_field(integrity_error)
+            raise FieldAlreadyExists(field=field, message=f"the {field} is already taken!") from integrity_error
+
+        return new_account  # type: ignore
+
+    async def read_accounts(
+        self,
+        after_id: Union[int, None] = None,
+        page_size: int = 10,
+        is_active: Union[bool, None] = None,
+        is_verified: Union[bool, None] = None,
+    ) -> Tuple[Sequence[Row], Union[int, None]]:
+        """keyset paginated listing ordered by id, returns the page along with
+        the id to continue after, or `None` on the last page, credentials are
+        never selected."""
+        stmt = select(*account_information_columns).order_by(Account.id).limit(page_size + 1)
+
+        if after_id is not None:
+            stmt = stmt.where(Account.id > after_id)
+        if is_active is not None:
+            stmt = stmt.where(Account.is_active == is_active)
+        if is_verified is not None:
+            stmt = stmt.where(Account.is_verified == is_verified)
 
-    async def read_accounts(self, page: int = 1, page_size: int = 10) -> Sequence[Account]:
-        stmt = select(Account).offset((page - 1) * page_size).limit(page_size)
         query = await self.session.execute(statement=stmt)
-        return query.scalars().all()
+        accounts = query.all()
+
+        if len(accounts) > page_size:
+            accounts = accounts[:page_size]
+            return accounts, accounts[-1].id
+        return accounts, None
 
     async def read_account_by_id(self, id: int) -> Account:
         stmt = select(Account).where(Account.id == id)
@@ -57,6 +130,30 @@ class AccountCRUD(SQLBase):
 
         return account  # type: ignore
 
+    async def read_accounts_by_ids(self, ids: Iterable[int]) -> Sequence[Row]:
+        """fetch several accounts with one `WHERE id = ANY(:ids)` query, the
+        single array parameter keeps the statement the same for any count.
+        ids that do not exist are left out, credentials are never selected."""
+        stmt = select(*account_information_columns).where(
+            Account.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer))),
+        )
+        query = await self.session.execute(statement=stmt)
+        return query.all()
+
+    async def read_many_accounts(self, ids: Sequence[int]) -> List[AccountInformationResponse]:
+        """resolve accounts through the cache with one MGET, read the misses
+        with one query and cache them in one pipeline, results follow the order
+        of `ids`, unknown ids are left out."""
+        users = await self.cache.get_many_account_data(ids)
+        missing_ids = [id for id in dict.fromkeys(ids) if id not in users]
+
+        if missing_ids:
+            accounts = await self.read_accounts_by_ids(missing_ids)
+            for user in await self.cache.set_many_account_data(accounts):
+                users[user.id] = user
+
+        return [users[id] for id in ids if id in users]
+
     async def read_account_by_username(self, username: str) -> Account:
         stmt = select(Account).where(Account.username == username)
         query = await self.session.execute(statement=stmt)
@@ -88,7 +185,7 @@ class AccountCRUD(SQLBase):
         if not account.is_active:
             raise UserNotActive("account is not active! please activate through email.")
 
-        if not pwd_generator.verify_password(
+        if not await pwd_generator.verify_password(
             hash_salt=account.hash_salt,
             password=password,
             hashed_password=account.hashed_password,
@@ -124,27 +221,35 @@ class AccountCRUD(SQLBase):
             raise EntityAlreadyExists(f"the username `{phone_number}` is already taken!")  # type: ignore
         return True
 
-    async def activate_account(self, account_id: int) -> Account:
-        select_stmt = select(Account).where(Account.id == account_id)
-        query = await self.session.execute(statement=select_stmt)
+    async def _update_account(self, account_id: int, **values) -> Account:
+        """apply `values` with a single UPDATE RETURNING, loading the updated
+        row into an `Account` instance without another SELECT, and write the
+        result through to the account cache."""
+        update_stmt = update(Account).where(Account.id == account_id).values(**values)
+        stmt = (
+            select(Account)
+            .from_statement(update_stmt.returning(*Account.__table__.columns))
+            .execution_options(populate_existing=True)
+        )
+        query = await self.session.execute(statement=stmt)
         update_account = query.scalar()
 
         if not update_account:
-            raise EntityDoesNotExist(f"account with id `{account_id}` does not exist!")  # type: ignore
-
-        update_stmt = (
-            update(Account)
-            .where(Account.id == update_account.id)
-            .values(
-                is_active=True,
-                updated_at=func.now(),
-            )
-        )
-        await self.session.execute(statement=update_stmt)
+            await self.session.rollback()
+            await self.cache.delete_account_data(account_id)
+            raise EntityDoesNotExist(f"account with id `{account_id}` does not exist!")
+
         await self.session.commit()
-        await self.session.refresh(instance=update_account)
+        await self.cache.set_account_data(update_account)
+
+        return update_account  # type: ignore
 
-        return update_account
+    async def activate_account(self, account_id: int) -> Account:
+        return await self._update_account(
+            account_id,
+            is_active=True,
+            updated_at=func.now(),
+        )
 
     async def update_password(
         self,
@@ -152,107 +257,74 @@ class AccountCRUD(SQLBase):
         current_password: str,
         new_password: str,
     ) -> Account:
-        select_stmt = select(Account).where(Account.id == account_id)
+        select_stmt = select(Account.hash_salt, Account.hashed_password).where(Account.id == account_id)
         query = await self.session.execute(statement=select_stmt)
-        update_account = query.scalar()
+        credentials = query.one_or_none()
 
-        if not update_account:
-            raise EntityDoesNotExist(f"Account with id `{account_id}` does not exist!")  # type: ignore
+        if not credentials:
+            raise EntityDoesNotExist(f"account with id `{account_id}` does not exist!")
 
-        if not pwd_generator.verify_password(
-            hash_salt=update_account.hash_salt,
+        if not await pwd_generator.verify_password(
+            hash_salt=credentials.hash_salt,
             password=current_password,
-            hashed_password=update_account.hashed_password,
+            hashed_password=credentials.hashed_password,
         ):
             raise PasswordDoesNotMatch("current password is wrong!")
 
-        updated_hash_salt = pwd_generator.generate_salt
-        updated_hashed_password = pwd_generator.generate_hashed_password(
+        updated_hash_salt = await pwd_generator.generate_salt()
+        updated_hashed_password = await pwd_generator.generate_hashed_password(
             hash_salt=updated_hash_salt,
             password=new_password,
         )
 
-        update_stmt = (
-            update(Account)
-            .where(Account.id == update_account.id)
-            .values(
-                updated_at=func.now(),
-                hash_salt=updated_hash_salt,
-                hashed_password=updated_hashed_password,
-            )
+        return await self._update_account(
+            account_id,
+            updated_at=func.now(),
+            hash_salt=updated_hash_salt,
+            hashed_password=updated_hashed_password,
         )
 
-        await self.session.execute(statement=update_stmt)
-        await self.session.commit()
-        await self.session.refresh(instance=update_account)
-
-        return update_account  # type: ignore
-
     async def update_email(
         self,
         account_id: int,
         new_email: str,
     ) -> Account:
-        select_stmt = select(Account).where(Account.id == account_id)
-        query = await self.session.execute(statement=select_stmt)
-        update_account = query.scalar()
-
-        if not update_account:
-            raise EntityDoesNotExist(f"Account with id `{account_id}` does not exist!")  # type: ignore
-
-        update_stmt = update(Account).where(Account.id == update_account.id).values(email=new_email)
-
-        await self.session.execute(statement=update_stmt)
-        await self.session.commit()
-        await self.session.refresh(instance=update_account)
-
-        return update_account  # type: ignore
+        return await self._update_account(account_id, email=new_email)
 
     async def reset_password(self, account_id: int, new_password: str) -> Account:
-        select_stmt = select(Account).where(Account.id == account_id)
-        query = await self.session.execute(statement=select_stmt)
-        update_account = query.scalar()
-
-        if not update_account:
-            raise EntityDoesNotExist(f"Account with id `{id}` does not exist!")  # type: ignore
-
-        updated_hash_salt = pwd_generator.generate_salt
-        updated_hashed_password = pwd_generator.generate_hashed_password(
+        updated_hash_salt = await pwd_generator.generate_salt()
+        updated_hashed_password = await pwd_generator.generate_hashed_password(
             hash_salt=updated_hash_salt,
             password=new_password,
         )
 
-        update_stmt = (
-            update(Account)
-            .where(Account.id == update_account.id)
-            .values(
-                updated_at=func.now(),
-                hash_salt=updated_hash_salt,
-                hashed_password=updated_hashed_password,
-            )
+        return await self._update_account(
+            account_id,
+            updated_at=func.now(),
+            hash_salt=updated_hash_salt,
+            hashed_password=updated_hashed_password,
         )
 
-        await self.session.execute(statement=update_stmt)
-        await self.session.commit()
-        await self.session.refresh(instance=update_account)
-
-        return update_account  # type: ignore
-
 
 class AccountValidationCRUD(SQLBase):
-    async def create_account_validation(self, account_id: int) -> AccountValidation:
-        try:
-            validation_key = generate_account_validation_token()
-            new_record = AccountValidation(account_id=account_id, validation_key=validation_key)
-            self.session.add(new_record)
-            await self.session.flush()
-            await self.session.commit()
-            await self.session.refresh(instance=new_record)
-            return new_record
-        except IntegrityError:
-            await self.session.rollback()
-            old_record = await self.fetch_account_validation(account_id=account_id)
-            return old_record
+    async def create_account_validation(self, account_id: int) -> str:
+        """store the digest of a new validation key, replacing any key the
+        account already has, and return the plain key for the email."""
+        validation_key = generate_account_validation_token()
+        insert_stmt = insert(AccountValidation).values(
+            account_id=account_id,
+            validation_key=hash_account_validation_token(validation_key),
+        )
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[AccountValidation.account_id],
+            set_={
+                "validation_key": insert_stmt.excluded.validation_key,
+                "created_at": func.now(),
+            },
+        )
+        await self.session.execute(statement=stmt)
+        await self.session.commit()
+        return validation_key
 
     async def fetch_account_validation(self, account_id: int) -> AccountValidation:
         stmt = select(AccountValidation).where(AccountValidation.account_id == account_id)
@@ -265,21 +337,39 @@ class AccountValidationCRUD(SQLBase):
         return record  # type: ignore
 
     async def delete_account_validation(self, validation_key: str) -> AccountValidation:
-        stmt = select(AccountValidation).where(
-            AccountValidation.validation_key == validation_key,
-            AccountValidation.created_at > datetime.now() - timedelta(minutes=5),
+        """consume an unexpired key with a single DELETE RETURNING, so two
+        concurrent clicks on the same link cannot both succeed."""
+        delete_stmt = delete(AccountValidation).where(
+            AccountValidation.validation_key == hash_account_validation_token(validation_key),
+            AccountValidation.created_at > func.now() - timedelta(seconds=settings.VALIDATION_KEY_TTL),
+        )
+        stmt = select(AccountValidation).from_statement(
+            delete_stmt.returning(*AccountValidation.__table__.columns),
         )
         query = await self.session.execute(statement=stmt)
-        account = query.scalar()
+        record = query.scalar()
 
-        if not account:
-            raise EntityDoesNotExist(f"no record with validation_key `{validation_key}` found!")
+        if not record:
+            await self.session.rollback()
+            raise EntityDoesNotExist("no record with the given validation_key found!")
 
-        stmt = delete(AccountValidation).where(AccountValidation.id == account.id)
-        await self.session.execute(statement=stmt)
         await self.session.commit()
+        return record  # type: ignore
 
-        return account
+    async def delete_expired_account_validations(self, batch_size: int) -> int:
+        """delete at most `batch_size` expired keys and return how many were
+        removed, rows locked by another sweeper are skipped."""
+        expired_ids = (
+            select(AccountValidation.id)
+            .where(AccountValidation.created_at <= func.now() - timedelta(seconds=settings.VALIDATION_KEY_TTL))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = delete(AccountValidation).where(AccountValidation.id.in_(expired_ids))
+        result = await self.session.execute(statement=stmt)
+        await self.session.commit()
+        return result.rowcount
 
 
 class UserCRUD(SQLBase):
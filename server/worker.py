@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from server.cache.base import connect_redis, disconnect_redis
+from server.cache.queue import Job, JobQueue
+from server.core.config import settings
+from server.database import connect_database, disconnect_database
+from server.services.email import SEND_EMAIL_JOB, handle_email_job
+from server.services.mailer import mail_sender
+from server.services.renderer import email_renderer
+from server.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class Worker:
+    """consume jobs enqueued by the API workers, at most `concurrency` at a
+    time, failed jobs are retried with exponential backoff and moved to the
+    dead letter stream after `max_attempts`."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: int,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        claim_idle: int,
+        consumer: str,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.claim_idle = claim_idle
+        self.consumer = consumer
+        self.running = False
+        self._tasks: Set[asyncio.Task] = set()
+        self._last_claim: float = 0.0
+
+    def get_retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff * 2**attempts, self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def process(self, job: Job) -> None:
+        handler = self.handlers.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"no handler registered for job {job.name}")
+            with tracer.start_trace(f"job {job.name}", kind=5) as span:
+                if span is not None:
+                    span.attributes.update({"job.id": job.id, "job.attempts": job.attempts})
+                await handler(job.payload)
+        except Exception as error:
+            logger.exception("job %s (%s) failed on attempt %d", job.id, job.name, job.attempts + 1)
+            if handler is None or job.attempts + 1 >= self.max_attempts:
+                await self.queue.dead_letter(job, error=repr(error))
+            else:
+                await self.queue.retry(job, delay=self.get_retry_delay(job.attempts))
+        else:
+            await self.queue.ack(job.id)
+
+    def _spawn(self, job: Job) -> None:
+        task = asyncio.create_task(self.process(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def poll(self, block: int = 1000) -> int:
+        """start as many jobs as there are free slots, returns how many."""
+        free = self.concurrency - len(self._tasks)
+        if free <= 0:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+            return 0
+
+        await self.queue.promote_due_jobs()
+
+        jobs = []
+        if time.monotonic() - self._last_claim >= self.claim_idle / 1000:
+            self._last_claim = time.monotonic()
+            jobs = await self.queue.claim_stale_jobs(self.consumer, min_idle=self.claim_idle, count=free)
+        if len(jobs) < free:
+            jobs += await self.queue.read_jobs(self.consumer, count=free - len(jobs), block=block)
+
+        for job in jobs:
+            self._spawn(job)
+        return len(jobs)
+
+    async def run(self) -> None:
+        await self.queue.create_group()
+        self.running = True
+        logger.info("worker %s consuming %s as %s", self.consumer, self.queue.stream, self.queue.group)
+
+        while self.running:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("failed to poll %s", self.queue.stream)
+                await asyncio.sleep(1)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self.running = False
+
+
+def get_worker() -> Worker:
+    return Worker(
+        queue=JobQueue(),
+        handlers={SEND_EMAIL_JOB: handle_email_job},
+        concurrency=settings.JOB_CONCURRENCY,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        backoff=settings.JOB_RETRY_BACKOFF,
+        backoff_max=settings.JOB_RETRY_BACKOFF_MAX,
+        claim_idle=settings.JOB_CLAIM_IDLE * 1000,
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+    )
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    await connect_database()
+    await connect_redis()
+    mail_sender.start()
+    email_renderer.load()
+    if tracer.enabled:
+        tracer.exporter.start()
+
+    worker = get_worker()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await mail_sender.stop()
+        if tracer.enabled:
+            await tracer.exporter.stop()
+        await disconnect_redis()
+        await disconnect_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
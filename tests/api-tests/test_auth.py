@@ -0,0 +1,256 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.cache import base as cache_base
+from server.core.config import settings
+from server.database import get_session
+from server.main import app
+from server.schemas.account import AccountInformationResponse
+from server.security.dependencies import (
+    forward_auth_cache,
+    get_account_validator,
+    get_redis_client,
+)
+from server.security.token import jwt_generator
+from server.services.exceptions import FieldAlreadyExists
+from server.sql.user import AccountCRUD
+
+client = TestClient(app)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+        return self
+
+    async def execute(self):
+        return [await self.redis.set(*args, **kwargs) for args, kwargs in self.commands]
+
+
+class FakeRedis:
+    def __init__(self, store):
+        self.store = store
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+
+def make_account(id: int, is_active: bool = True):
+    return SimpleNamespace(
+        id=id,
+        username=f"someuser{id}",
+        email=f"someuser{id}@example.com",
+        phone_number=None,
+        is_active=is_active,
+        is_verified=False,
+        created_at=datetime(2023, 2, 5, 11, 44, 39),
+        updated_at=None,
+    )
+
+
+@pytest.fixture
+def overrides(monkeypatch):
+    cached = {
+        f"auth-{id}": AccountInformationResponse.from_orm(make_account(id, is_active=id != 4)).json() for id in (1, 4)
+    }
+    redis = FakeRedis(cached)
+    monkeypatch.setattr(cache_base, "redis_client", redis)
+    app.dependency_overrides[get_redis_client] = lambda: redis
+    app.dependency_overrides[get_session] = lambda: None
+
+    requested_ids = []
+
+    async def read_accounts_by_ids(self, ids):
+        requested_ids.append(list(ids))
+        return [make_account(id, is_active=False) for id in ids if id in (2, 5)]
+
+    monkeypatch.setattr(AccountCRUD, "read_accounts_by_ids", read_accounts_by_ids)
+    monkeypatch.setattr(settings, "INTROSPECTION_CLIENTS", {"gateway": "gateway-secret"})
+    yield requested_ids
+    app.dependency_overrides.clear()
+    redis.store.clear()
+
+
+def test_introspect_tokens(overrides):
+    tokens = [jwt_generator.generate_access_token(account=make_account(id)) for id in (1, 2, 3)]
+    response = client.post(
+        "/auth/introspect",
+        json={"tokens": tokens + ["not-a-token"]},
+        auth=("gateway", "gateway-secret"),
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["valid"] for result in results] == [True, True, False, False]
+    assert results[0]["claims"]["username"] == "someuser1"
+    assert results[0]["isActive"] is True
+    assert results[1]["isActive"] is False
+    assert results[2]["claims"] is None
+    assert overrides == [[2, 3]]
+
+
+def test_introspect_tokens_requires_tokens(overrides):
+    response = client.post("/auth/introspect", json={"tokens": []}, auth=("gateway", "gateway-secret"))
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("auth", [None, ("gateway", "wrong-secret"), ("unknown", "gateway-secret")])
+def test_introspect_tokens_rejects_unauthenticated_clients(overrides, auth):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    response = client.post("/auth/introspect", json={"tokens": [token]}, auth=auth)
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Basic"
+    assert overrides == []
+
+
+def test_verify_forward_auth(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    response = client.get("/auth/verify", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.headers["X-User-Id"] == "1"
+    assert response.headers["X-Username"] == "someuser1"
+    assert response.content == b""
+    assert forward_auth_cache.get(token) is not None
+
+
+@pytest.mark.parametrize("authorization", [None, "Basic abc", "Bearer not-a-token"])
+def test_verify_forward_auth_rejects_bad_credentials(overrides, authorization):
+    headers = {"Authorization": authorization} if authorization else {}
+    response = client.get("/auth/verify", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_verify_forward_auth_rejects_inactive_user(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(4))
+    response = client.get("/auth/verify", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_read_accounts_by_ids(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/auth/accounts/bulk?ids=5&ids=3&ids=1&ids=2&ids=5", headers=headers)
+
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [5, 1, 2, 5]
+    assert overrides == [[5, 3, 2]]
+
+    response = client.get("/auth/accounts/bulk?ids=5&ids=2", headers=headers)
+    assert [user["id"] for user in response.json()] == [5, 2]
+    assert overrides == [[5, 3, 2]]
+
+
+def test_read_account_by_id_from_cache(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    response = client.get("/auth/4", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": 4,
+        "username": "someuser4",
+        "email": "someuser4@example.com",
+        "phoneNumber": None,
+        "isActive": False,
+        "isVerified": False,
+        "createdAt": "2023-02-05T11:44:39Z",
+        "updatedAt": None,
+    }
+    assert overrides == []
+
+
+def test_read_account_by_id_not_found(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    response = client.get("/auth/3", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 404
+    assert overrides == [[3]]
+
+
+def test_signout_revokes_token(overrides):
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/4", headers=headers).status_code == 200
+
+    response = client.post("/auth/signout", headers=headers)
+    assert response.status_code == 200
+
+    response = client.get("/auth/4", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == 'Bearer error="invalid_token"'
+    assert client.get("/auth/verify", headers=headers).status_code == 401
+
+
+def test_password_reset_revokes_account_tokens(overrides, monkeypatch):
+    class FakeValidator:
+        async def delete_account_validation(self, validation_key):
+            return SimpleNamespace(account_id=1)
+
+    async def reset_password(self, account_id, new_password):
+        return make_account(account_id)
+
+    monkeypatch.setattr(AccountCRUD, "reset_password", reset_password)
+    app.dependency_overrides[get_account_validator] = FakeValidator
+    token = jwt_generator.generate_access_token(account=make_account(1))
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/4", headers=headers).status_code == 200
+
+    response = client.patch(
+        "/auth/password/reset/some-key",
+        data={"newPassword": "NewPassw0rd!", "repeatNewPassword": "NewPassw0rd!"},
+    )
+    assert response.status_code == 202
+
+    assert client.get("/auth/4", headers=headers).status_code == 401
+    response = client.post("/auth/introspect", json={"tokens": [token]}, auth=("gateway", "gateway-secret"))
+    assert response.json()["results"] == [{"valid": False, "claims": None, "isActive": False, "isVerified": False}]
+
+    new_token = jwt_generator.generate_access_token(account=make_account(1), generation=1)
+    assert client.get("/auth/4", headers={"Authorization": f"Bearer {new_token}"}).status_code == 200
+
+
+def test_signup_names_taken_field(overrides, monkeypatch):
+    async def create_account(self, **kwargs):
+        raise FieldAlreadyExists(field="email", message="the email is already taken!")
+
+    monkeypatch.setattr(AccountCRUD, "create_account", create_account)
+    response = client.post(
+        "/auth/signup",
+        data={
+            "username": "someuser1",
+            "email": "someuser1@example.com",
+            "newPassword": "NewPassw0rd!",
+            "repeatNewPassword": "NewPassw0rd!",
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == {"msg": "Signup failed! Recheck all your credentials!", "field": "email"}
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from server.main import app
+
+client = TestClient(app)
+
+
+def test_database_pool_health():
+    response = client.get("/health/database")
+    assert response.status_code == 200
+    assert set(response.json()) == {"poolSize", "maxOverflow", "checkedIn", "checkedOut", "overflow"}
+
+
+def test_cache_health():
+    response = client.get("/health/cache")
+    assert response.status_code == 200
+    assert set(response.json()) == {"account", "token", "forwardAuth"}
+
+
+def test_read_jwks():
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "keys" in response.json()
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+
+def test_metrics():
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{route="health",method="GET",status="200"}' in response.text
+    assert "# TYPE database_pool_checked_out gauge" in response.text
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+from benchmarks.load import percentile, read_activation_keys, run_phase, summarize
+from benchmarks.smtp_sink import SMTPSink
+from server.core.config import settings
+from server.services.mailer import MailSender, mail_sender
+
+
+def test_percentile_nearest_rank():
+    ordered = [float(value) for value in range(1, 101)]
+
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 95) == 95.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.001, 0.002, 0.003, 0.004], errors=1, elapsed=2.0)
+
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["rps"] == 2.0
+    assert summary["p50_ms"] == 2.0
+    assert summary["max_ms"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_run_phase_counts_errors():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404 if request.url.path == "/missing" else 200)
+
+    requests = [lambda client: client.get("/ok"), lambda client: client.get("/missing")] * 3
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+        result = await run_phase(client, requests, concurrency=2)
+
+    assert result["requests"] == 6
+    assert result["errors"] == 3
+    assert [response.status_code for response in result["responses"]] == [200, 404] * 3
+
+
+@pytest.mark.asyncio
+async def test_sink_receives_activation_email():
+    sink = SMTPSink()
+    await sink.start()
+    config = mail_sender.config.copy(
+        update={
+            "MAIL_SERVER": sink.host,
+            "MAIL_PORT": sink.port,
+            "MAIL_STARTTLS": False,
+            "MAIL_SSL_TLS": False,
+            "USE_CREDENTIALS": False,
+            "SUPPRESS_SEND": 0,
+        },
+    )
+    sender = MailSender(config=config, pool_size=1)
+    url = f"{settings.ACTIVATION_URL}/secret-key"
+    try:
+        await sender.send(sender.build_message("subject", ["john@example.com"], f"<a>{url}</a>", text=url))
+        await sink.wait_for(1, timeout=5)
+    finally:
+        await sender.stop()
+        await sink.stop()
+
+    assert read_activation_keys(sink) == {"john@example.com": "secret-key"}
+
+
+@pytest.mark.asyncio
+async def test_sink_wait_for_reports_timeout():
+    sink = SMTPSink()
+
+    assert await sink.wait_for(0, timeout=0.01) is True
+    assert await sink.wait_for(1, timeout=0.01) is False
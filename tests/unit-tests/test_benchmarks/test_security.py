@@ -0,0 +1,55 @@
+import json
+
+from benchmarks.security import (
+    Case,
+    compare,
+    get_environment,
+    get_environment_changes,
+    get_parser,
+    main,
+    run_cases,
+    time_case,
+)
+
+
+def test_time_case_reports_microseconds_per_call():
+    calls = []
+    case = Case("append", lambda: calls.append(None), 10)
+
+    assert time_case(case, repeats=3) >= 0
+    assert len(calls) == 31
+
+
+def test_run_cases_keeps_iterations():
+    results = run_cases([Case("noop", lambda: None, 100)], repeats=1)
+
+    assert results["noop"]["iterations"] == 100
+    assert "per_call_us" in results["noop"]
+
+
+def test_compare_flags_regression_past_threshold():
+    baseline = {"fast": {"per_call_us": 10.0}, "slow": {"per_call_us": 10.0}}
+    results = {"fast": {"per_call_us": 11.0}, "slow": {"per_call_us": 13.0}, "new": {"per_call_us": 1.0}}
+
+    report = compare(results, baseline, threshold=25.0)
+
+    assert report["fast"] == {"change_percent": 10.0, "regressed": False}
+    assert report["slow"] == {"change_percent": 30.0, "regressed": True}
+    assert report["new"] == {"change_percent": None, "regressed": False}
+
+
+def test_environment_changes_lists_differing_keys():
+    changes = get_environment_changes(
+        {"python": "3.10.13", "machine": "x86_64"}, {"python": "3.11.4", "machine": "x86_64"}
+    )
+
+    assert changes == {"python": {"baseline": "3.11.4", "current": "3.10.13"}}
+
+
+def test_main_refuses_baseline_from_another_environment(tmp_path, capsys):
+    baseline = tmp_path / "security.json"
+    environment = {**get_environment(), "python": "0.0.0"}
+    baseline.write_text(json.dumps({"environment": environment, "threshold": 25.0, "cases": {}}))
+
+    assert main(get_parser().parse_args(["--baseline", str(baseline)])) == 2
+    assert "refusing to compare" in capsys.readouterr().err
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.tracing import run_variants
+from server.services import tracing
+
+
+@pytest.mark.asyncio
+async def test_run_variants_reports_overhead_against_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "tracer", tracing.tracer)
+    results = await run_variants(iterations=2, repeats=3)
+
+    assert list(results) == ["disabled", "sampled_out", "sampled"]
+    assert results["disabled"]["overhead_percent"] == 0.0
+    assert all(result["per_request_us"] > 0 for result in results.values())
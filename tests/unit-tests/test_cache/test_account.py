@@ -0,0 +1,78 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from server.cache.account import AccountRedis
+from server.cache.memory import MemoryCache
+from server.core.config import settings
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.expiry[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+def make_account(**overrides):
+    account = dict(
+        id=1,
+        username="someuser",
+        email="someuser@example.com",
+        phone_number=None,
+        is_active=True,
+        is_verified=False,
+        created_at=datetime(2023, 2, 5, 11, 44, 39),
+        updated_at=None,
+    )
+    account.update(overrides)
+    return SimpleNamespace(**account)
+
+
+@pytest.mark.asyncio
+async def test_account_redis_round_trip():
+    redis = FakeRedis()
+    cache = AccountRedis(redis=redis)
+
+    await cache.set_account_data(make_account())
+    assert redis.expiry["auth-1"] == settings.ACCOUNT_CACHE_TTL
+
+    cached = await cache.get_account_data(1)
+    assert cached.username == "someuser"
+    assert cached.is_active is True
+
+
+@pytest.mark.asyncio
+async def test_account_redis_delete():
+    cache = AccountRedis(redis=FakeRedis())
+
+    await cache.set_account_data(make_account())
+    await cache.delete_account_data(1)
+    assert await cache.get_account_data(1) is None
+
+
+@pytest.mark.asyncio
+async def test_account_redis_memory_tier():
+    redis = FakeRedis()
+    memory = MemoryCache(max_size=10, ttl=60)
+    cache = AccountRedis(redis=redis, memory=memory)
+
+    await cache.set_account_data(make_account())
+    redis.store.clear()
+    assert (await cache.get_account_data(1)).username == "someuser"
+    assert memory.hits == 1
+
+    await cache.delete_account_data(1)
+    assert await cache.get_account_data(1) is None
+    assert memory.misses == 1
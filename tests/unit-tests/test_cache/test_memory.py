@@ -0,0 +1,44 @@
+import time
+
+from server.cache.memory import MemoryCache
+
+
+def test_memory_cache_get_and_set():
+    cache = MemoryCache(max_size=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    now = time.monotonic()
+    cache = MemoryCache(max_size=2, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_memory_cache_delete():
+    cache = MemoryCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None
@@ -0,0 +1,149 @@
+import json
+import time
+
+import pytest
+
+from server.cache.queue import PROMOTE_DUE_JOBS_SCRIPT, Job, JobQueue
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.streams = {}
+        self.acked = []
+        self.sorted_sets = {}
+        self.pending = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def xadd(self, name, fields, maxlen=None):
+        entries = self.streams.setdefault(name, [])
+        job_id = f"{len(entries) + 1}-0"
+        entries.append((job_id, {key: str(value) for key, value in fields.items()}))
+        return job_id
+
+    async def xack(self, name, group, *ids):
+        self.acked.extend(ids)
+        return len(ids)
+
+    async def zadd(self, name, mapping):
+        self.sorted_sets.setdefault(name, {}).update(mapping)
+
+    async def zrangebyscore(self, name, low, high, start=None, num=None):
+        members = self.sorted_sets.get(name, {})
+        return [member for member, score in sorted(members.items(), key=lambda item: item[1]) if low <= score <= high]
+
+    async def zrem(self, name, member):
+        return int(self.sorted_sets.get(name, {}).pop(member, None) is not None)
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        assert script == PROMOTE_DUE_JOBS_SCRIPT
+        (delayed_key, stream), (now, limit, maxlen) = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        members = (await self.zrangebyscore(delayed_key, 0, now))[:limit]
+        for member in members:
+            await self.zrem(delayed_key, member)
+            await self.xadd(stream, json.loads(member), maxlen=maxlen)
+        return len(members)
+
+    async def xpending_range(self, name, group, min, max, count):
+        def parse(job_id):
+            return tuple(int(part) for part in job_id.split("-"))
+
+        entries = [
+            {"message_id": job_id, "time_since_delivered": idle}
+            for job_id, idle in sorted(self.pending.items(), key=lambda item: parse(item[0]))
+            if min == "-" or parse(job_id) >= parse(min)
+        ]
+        return entries[:count]
+
+    async def xclaim(self, name, group, consumer, min_idle_time, message_ids):
+        return [(job_id, fields) for job_id, fields in self.streams.get(name, []) if job_id in message_ids]
+
+
+@pytest.fixture
+def queue():
+    return JobQueue(redis=FakeRedis())
+
+
+@pytest.mark.asyncio
+async def test_enqueue_serializes_payload(queue):
+    job_id = await queue.enqueue("send_email", {"account_id": 7})
+
+    [(entry_id, fields)] = queue.redis.streams[queue.stream]
+    assert entry_id == job_id
+    assert JobQueue._parse_entries([(entry_id, fields)]) == [Job(job_id, "send_email", {"account_id": 7}, 0)]
+
+
+@pytest.mark.asyncio
+async def test_retry_waits_until_due(queue):
+    job = Job("1-0", "send_email", {"account_id": 7}, 0)
+    await queue.retry(job, delay=60)
+
+    assert queue.redis.acked == ["1-0"]
+    assert await queue.promote_due_jobs() == 0
+
+    member = next(iter(queue.redis.sorted_sets[queue.delayed_key]))
+    queue.redis.sorted_sets[queue.delayed_key][member] = time.time() - 1
+    assert await queue.promote_due_jobs() == 1
+
+    [promoted] = JobQueue._parse_entries(queue.redis.streams[queue.stream])
+    assert promoted.attempts == 1
+    assert promoted.payload == {"account_id": 7}
+    assert queue.redis.sorted_sets[queue.delayed_key] == {}
+
+
+@pytest.mark.asyncio
+async def test_retry_keeps_identical_jobs_apart(queue):
+    await queue.retry(Job("1-0", "send_email", {"account_id": 7}, 0), delay=-1)
+    await queue.retry(Job("2-0", "send_email", {"account_id": 7}, 0), delay=-1)
+
+    assert len(queue.redis.sorted_sets[queue.delayed_key]) == 2
+    assert await queue.promote_due_jobs() == 2
+    promoted = JobQueue._parse_entries(queue.redis.streams[queue.stream])
+    assert [job.payload for job in promoted] == [{"account_id": 7}, {"account_id": 7}]
+    assert sorted(fields["retry_of"] for _, fields in queue.redis.streams[queue.stream]) == ["1-0", "2-0"]
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_keeps_error(queue):
+    job = Job("1-0", "send_email", {"account_id": 7}, 4)
+    await queue.dead_letter(job, error="SMTPServerDisconnected()")
+
+    [(_, fields)] = queue.redis.streams[queue.dead_letter_stream]
+    assert queue.redis.acked == ["1-0"]
+    assert fields["error"] == "SMTPServerDisconnected()"
+    assert fields["attempts"] == "5"
+    assert json.loads(fields["payload"]) == {"account_id": 7}
+
+
+@pytest.mark.asyncio
+async def test_claim_stale_jobs_pages_through_pending(queue):
+    for index in range(5):
+        await queue.enqueue("send_email", {"account_id": index})
+    queue.redis.pending = {"1-0": 10, "2-0": 10, "3-0": 60000, "4-0": 10, "5-0": 60000}
+
+    jobs = await queue.claim_stale_jobs("worker-2", min_idle=30000, count=2)
+
+    assert [job.id for job in jobs] == ["3-0", "5-0"]
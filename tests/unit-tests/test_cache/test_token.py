@@ -0,0 +1,67 @@
+import pytest
+
+from server.cache.token import TokenRevocationRedis
+from server.core.config import settings
+from server.schemas.token import JWTClaims
+from server.security.token import hash_access_token
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = str(value)
+        self.expiry[key] = ex
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+
+def make_claims(id: int, generation: int = 0):
+    return JWTClaims(
+        id=id,
+        username=f"someuser{id}",
+        email=f"someuser{id}@example.com",
+        generation=generation,
+    )
+
+
+@pytest.mark.asyncio
+async def test_revoke_token():
+    redis = FakeRedis()
+    revocations = TokenRevocationRedis(redis=redis)
+
+    await revocations.revoke_token("token-a")
+    assert redis.expiry[f"token-revoked-{hash_access_token('token-a')}"] == settings.JWT_MIN * 60
+
+    revoked = await revocations.get_revoked([("token-a", make_claims(1)), ("token-b", make_claims(1))])
+    assert revoked == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_revoke_account_tokens():
+    redis = FakeRedis()
+    revocations = TokenRevocationRedis(redis=redis)
+    assert await revocations.get_generation(1) == 0
+
+    assert await revocations.revoke_account_tokens(1) == 1
+    assert await revocations.get_generation(1) == 1
+    assert "token-generation-1" not in redis.expiry
+
+    assert await revocations.is_revoked("token-a", make_claims(1, generation=0)) is True
+    assert await revocations.is_revoked("token-b", make_claims(1, generation=1)) is False
+    assert await revocations.is_revoked("token-c", make_claims(2, generation=0)) is False
+
+
+@pytest.mark.asyncio
+async def test_get_revoked_without_tokens():
+    assert await TokenRevocationRedis(redis=FakeRedis()).get_revoked([]) == []
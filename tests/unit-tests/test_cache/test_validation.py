@@ -0,0 +1,93 @@
+import pytest
+
+from server.cache.validation import (
+    CONSUME_VALIDATION_SCRIPT,
+    CREATE_VALIDATION_SCRIPT,
+    AccountValidationRedis,
+)
+from server.core.config import settings
+from server.security.token import hash_account_validation_token
+from server.services.exceptions import EntityDoesNotExist
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = str(value)
+        self.expiry[key] = ex
+
+    async def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == CREATE_VALIDATION_SCRIPT:
+            (account_key, key), (digest, account_id, ttl, prefix) = keys, args
+            old_digest = await self.get(account_key)
+            if old_digest:
+                await self.delete(prefix + old_digest)
+            await self.set(key, account_id, ex=ttl)
+            await self.set(account_key, digest, ex=ttl)
+            return old_digest
+
+        assert script == CONSUME_VALIDATION_SCRIPT
+        [key], (digest, prefix) = keys, args
+        account_id = await self.get(key)
+        if not account_id:
+            return None
+        await self.delete(key)
+        if await self.get(prefix + account_id) == digest:
+            await self.delete(prefix + account_id)
+        return account_id
+
+
+@pytest.mark.asyncio
+async def test_validation_key_is_consumed_once():
+    redis = FakeRedis()
+    validator = AccountValidationRedis(redis=redis)
+
+    validation_key = await validator.create_account_validation(7)
+    digest = hash_account_validation_token(validation_key)
+    assert f"validation-{validation_key}" not in redis.store
+    assert redis.expiry[f"validation-{digest}"] == settings.VALIDATION_KEY_TTL
+    assert (await validator.fetch_account_validation(7)).validation_key == digest
+
+    record = await validator.delete_account_validation(validation_key)
+    assert record.account_id == 7
+    with pytest.raises(EntityDoesNotExist):
+        await validator.delete_account_validation(validation_key)
+    with pytest.raises(EntityDoesNotExist):
+        await validator.fetch_account_validation(7)
+
+
+@pytest.mark.asyncio
+async def test_new_validation_key_replaces_old_one():
+    validator = AccountValidationRedis(redis=FakeRedis())
+
+    old_key = await validator.create_account_validation(7)
+    new_key = await validator.create_account_validation(7)
+
+    with pytest.raises(EntityDoesNotExist):
+        await validator.delete_account_validation(old_key)
+    assert (await validator.delete_account_validation(new_key)).account_id == 7
+
+
+@pytest.mark.asyncio
+async def test_consuming_a_key_keeps_a_newer_pointer():
+    redis = FakeRedis()
+    validator = AccountValidationRedis(redis=redis)
+    old_key = await validator.create_account_validation(7)
+    old_digest = hash_account_validation_token(old_key)
+    new_key = await validator.create_account_validation(7)
+    new_digest = hash_account_validation_token(new_key)
+    # the old key was read by a request that raced with the new one
+    await redis.set(f"validation-{old_digest}", 7)
+
+    assert (await validator.delete_account_validation(old_key)).account_id == 7
+    assert (await validator.fetch_account_validation(7)).validation_key == new_digest
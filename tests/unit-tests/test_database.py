@@ -0,0 +1,10 @@
+from server import database
+from server.services.metrics import registry
+
+
+def test_pool_gauges_do_not_create_engine(monkeypatch):
+    monkeypatch.setattr(database, "engine", None)
+
+    assert database.get_database_pool_status()["checked_out"] == 0
+    assert "database_pool_checked_out 0" in registry.render()
+    assert database.engine is None
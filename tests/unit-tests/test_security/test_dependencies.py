@@ -0,0 +1,58 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from server.cache.account import AccountRedis
+from server.core.config import settings
+from server.schemas.token import JWTData
+from server.security.dependencies import get_current_user
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.expiry[key] = ex
+
+
+class FakeAccountCRUD:
+    def __init__(self):
+        self.reads = []
+
+    async def read_account_by_username(self, username):
+        self.reads.append(username)
+        return SimpleNamespace(
+            id=1,
+            username=username,
+            email="someuser@example.com",
+            phone_number=None,
+            is_active=True,
+            is_verified=False,
+            created_at=datetime(2023, 2, 5, 11, 44, 39),
+            updated_at=None,
+        )
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_repopulates_cache_on_miss(monkeypatch):
+    monkeypatch.setattr(settings, "ACCOUNT_CACHE_TTL", 1234)
+    redis = FakeRedis()
+    cache = AccountRedis(redis=redis, memory=None)
+    account = FakeAccountCRUD()
+    user_data = JWTData(id=1, username="someuser", email="someuser@example.com")
+
+    user = await get_current_user(user_data=user_data, account=account, redis=cache)
+    assert user.username == "someuser"
+    assert account.reads == ["someuser"]
+    assert redis.expiry == {"auth-1": 1234}
+
+    cached = await get_current_user(user_data=user_data, account=account, redis=cache)
+    assert cached.username == "someuser"
+    assert account.reads == ["someuser"]
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from server.security.keys import JWTKeyRing
+from server.security.token import JWTGenerator
+
+
+def write_private_key(path):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    path.write_bytes(pem)
+
+
+@pytest.fixture
+def keys_dir(tmp_path):
+    write_private_key(tmp_path / "2023-01.pem")
+    write_private_key(tmp_path / "2023-02.pem")
+    return tmp_path
+
+
+def make_account():
+    return SimpleNamespace(id=1, username="someuser", email="someuser@example.com", phone_number=None)
+
+
+def test_symmetric_key_ring_publishes_no_keys():
+    key_ring = JWTKeyRing(algorithm="HS256", secret_key="secret")
+    assert key_ring.signing_key == (None, "secret")
+    assert key_ring.jwks() == {"keys": []}
+
+
+def test_asymmetric_key_ring_requires_keys(tmp_path):
+    with pytest.raises(ValueError):
+        JWTKeyRing(algorithm="ES256", secret_key="secret")
+    with pytest.raises(ValueError):
+        JWTKeyRing(algorithm="ES256", secret_key="secret", keys_dir=str(tmp_path))
+
+
+def test_asymmetric_key_ring_signs_with_kid(keys_dir):
+    key_ring = JWTKeyRing(algorithm="ES256", secret_key="secret", keys_dir=str(keys_dir))
+    generator = JWTGenerator(key_ring=key_ring)
+    token = generator.generate_access_token(account=make_account())
+
+    assert jwt.get_unverified_header(token)["kid"] == "2023-02"
+    assert generator.retrieve_token_details(token).username == "someuser"
+
+    jwks = key_ring.jwks()
+    assert [key["kid"] for key in jwks["keys"]] == ["2023-01", "2023-02"]
+    assert all("d" not in key for key in jwks["keys"])
+
+
+def test_rotated_keys_still_verify(keys_dir):
+    old_ring = JWTKeyRing(algorithm="ES256", secret_key="secret", keys_dir=str(keys_dir), active_kid="2023-01")
+    token = JWTGenerator(key_ring=old_ring).generate_access_token(account=make_account())
+
+    new_ring = JWTKeyRing(algorithm="ES256", secret_key="secret", keys_dir=str(keys_dir), active_kid="2023-02")
+    assert JWTGenerator(key_ring=new_ring).retrieve_token_details(token).id == 1
+
+    (keys_dir / "2023-01.pem").unlink()
+    retired_ring = JWTKeyRing(algorithm="ES256", secret_key="secret", keys_dir=str(keys_dir))
+    with pytest.raises(ValueError):
+        JWTGenerator(key_ring=retired_ring).retrieve_token_details(token)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from server.security.pool import HashingPool
+from server.services.exceptions import HashingPoolSaturated
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_in_worker_process():
+    pool = HashingPool(max_workers=1, queue_depth=2)
+    try:
+        result = await pool.run(pow, 2, 10)
+        assert result == 1024
+        assert pool.pending == 0
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated():
+    pool = HashingPool(max_workers=1, queue_depth=1)
+    try:
+        running = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingPoolSaturated):
+            await pool.run(time.sleep, 0)
+        await running
+        assert pool.pending == 0
+    finally:
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_shutdown_does_not_block_loop():
+    pool = HashingPool(max_workers=1, queue_depth=1)
+    running = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+    await asyncio.sleep(0.1)
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.ensure_future(tick())
+    await pool.shutdown()
+    ticker.cancel()
+
+    assert ticks > 10
+    assert await running is None
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from server.cache.memory import MemoryCache
+from server.security.token import (
+    JWTGenerator,
+    generate_account_validation_token,
+    hash_account_validation_token,
+)
+
+
+def test_generate_account_validation_token():
+    token = generate_account_validation_token()
+    assert len(token) == 64
+    assert token != generate_account_validation_token()
+
+
+def test_hash_account_validation_token():
+    token = generate_account_validation_token()
+    digest = hash_account_validation_token(token)
+    assert len(digest) == 64
+    assert digest != token
+    assert digest == hash_account_validation_token(token)
+
+
+def test_retrieve_token_details_is_cached():
+    cache = MemoryCache(max_size=10, ttl=60)
+    generator = JWTGenerator(cache=cache)
+    account = SimpleNamespace(id=1, username="someuser", email="someuser@example.com", phone_number=None)
+    token = generator.generate_access_token(account=account)
+
+    first = generator.retrieve_token_details(token)
+    second = generator.retrieve_token_details(token)
+    assert first is second
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    generator.invalidate_token(token)
+    assert generator.retrieve_token_details(token) == first
+    assert cache.misses == 2
+
+
+def test_access_token_carries_generation():
+    generator = JWTGenerator()
+    account = SimpleNamespace(id=1, username="someuser", email="someuser@example.com", phone_number=None)
+
+    assert generator.retrieve_token_details(generator.generate_access_token(account=account)).generation == 0
+    token = generator.generate_access_token(account=account, generation=3)
+    assert generator.retrieve_token_details(token).generation == 3
+
+
+def test_retrieve_token_details_rejects_invalid_token():
+    generator = JWTGenerator(cache=MemoryCache(max_size=10, ttl=60))
+    with pytest.raises(ValueError):
+        generator.retrieve_token_details("not-a-token")
+    assert len(generator.cache) == 0
@@ -0,0 +1,15 @@
+from server.cache.validation import AccountValidationRedis
+from server.core.config import settings
+from server.security.validation import create_account_validator
+from server.services.validators import ValidationKeyStore
+from server.sql.user import AccountValidationCRUD
+
+
+def test_create_account_validator_follows_store(monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATION_KEY_STORE", ValidationKeyStore.database)
+    validator = create_account_validator(session="session")
+    assert isinstance(validator, AccountValidationCRUD)
+    assert validator.session == "session"
+
+    monkeypatch.setattr(settings, "VALIDATION_KEY_STORE", ValidationKeyStore.redis)
+    assert isinstance(create_account_validator(session="session"), AccountValidationRedis)
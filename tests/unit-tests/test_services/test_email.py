@@ -3,7 +3,7 @@ import unittest
 from fastapi_mail import ConnectionConfig
 
 from server.core.config import settings
-from server.services.email import get_mail_config
+from server.services.mailer import get_mail_config
 
 
 class TestGetMailConfig(unittest.TestCase):
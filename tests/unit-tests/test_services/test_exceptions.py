@@ -3,6 +3,8 @@ import pytest
 from server.services.exceptions import (
     EntityAlreadyExists,
     EntityDoesNotExist,
+    FieldAlreadyExists,
+    HashingPoolSaturated,
     PasswordDoesNotMatch,
     UserNotActive,
 )
@@ -18,6 +20,12 @@ def test_entity_already_exists_exception():
         raise EntityAlreadyExists("Data already exists in the database.")
 
 
+def test_field_already_exists_exception():
+    with pytest.raises(EntityAlreadyExists) as exc_info:
+        raise FieldAlreadyExists(field="username", message="Username already exists in the database.")
+    assert exc_info.value.field == "username"
+
+
 def test_password_does_not_match_exception():
     with pytest.raises(PasswordDoesNotMatch):
         raise PasswordDoesNotMatch("Passwords do not match.")
@@ -26,3 +34,8 @@ def test_password_does_not_match_exception():
 def test_user_not_active_exception():
     with pytest.raises(UserNotActive):
         raise UserNotActive("User is not active.")
+
+
+def test_hashing_pool_saturated_exception():
+    with pytest.raises(HashingPoolSaturated):
+        raise HashingPoolSaturated("Too many hashing jobs in flight.")
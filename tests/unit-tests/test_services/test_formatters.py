@@ -1,8 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+import pytest
 
 from server.services.formatters import (
+    decode_cursor,
+    encode_cursor,
     format_datetime_into_isoformat,
     format_dict_key_to_camel_case,
+    parse_isoformat,
 )
 
 
@@ -14,3 +19,27 @@ def test_format_dict_key_to_camel_case():
 def test_format_datetime_into_isoformat():
     timestamp = datetime(2023, 2, 5, 11, 44, 39, 272446)
     assert format_datetime_into_isoformat(timestamp) == "2023-02-05T11:44:39.272446Z"
+
+
+def test_format_dict_key_to_camel_case_is_memoized():
+    format_dict_key_to_camel_case("phone_number")
+    hits = format_dict_key_to_camel_case.cache_info().hits
+    assert format_dict_key_to_camel_case("phone_number") == "phoneNumber"
+    assert format_dict_key_to_camel_case.cache_info().hits == hits + 1
+
+
+def test_parse_isoformat_round_trip():
+    timestamp = datetime(2023, 2, 5, 11, 44, 39, 272446, tzinfo=timezone.utc)
+    assert parse_isoformat(format_datetime_into_isoformat(timestamp)) == timestamp
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == 42
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1)[:-2], "eyJpZCI6IngifQ"])
+def test_decode_cursor_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
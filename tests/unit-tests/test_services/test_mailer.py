@@ -0,0 +1,138 @@
+import aiosmtplib
+import pytest
+
+from server.services import mailer
+from server.services.mailer import MailSender
+from server.services.metrics import email_send_outcomes
+from server.services.tracing import SpanExporter, Tracer
+
+
+class FakeSMTP:
+    instances = []
+    fail_next_send = False
+    fail_connect = False
+    fail_login = False
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.is_connected = False
+        self.logins = 0
+        self.sent = []
+        self.instances.append(self)
+
+    async def connect(self):
+        if FakeSMTP.fail_connect:
+            raise aiosmtplib.SMTPConnectError("connection refused")
+        self.is_connected = True
+
+    async def login(self, username, password):
+        if FakeSMTP.fail_login:
+            raise aiosmtplib.SMTPAuthenticationError(535, "authentication failed")
+        self.logins += 1
+
+    async def send_message(self, message):
+        if FakeSMTP.fail_next_send:
+            FakeSMTP.fail_next_send = False
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        self.sent.append(message)
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.fail_next_send = False
+    FakeSMTP.fail_connect = False
+    FakeSMTP.fail_login = False
+    monkeypatch.setattr(mailer.aiosmtplib, "SMTP", FakeSMTP)
+
+    config = mailer.mail_sender.config.copy(update={"SUPPRESS_SEND": 0, "USE_CREDENTIALS": True})
+    mail_sender = MailSender(config=config, pool_size=2)
+    mail_sender.start()
+    return mail_sender
+
+
+@pytest.mark.asyncio
+async def test_send_reuses_connection(sender):
+    for index in range(3):
+        await sender.send(sender.build_message(f"subject {index}", ["user@example.com"], "<p>hi</p>"))
+
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].logins == 1
+    assert len(FakeSMTP.instances[0].sent) == 3
+
+
+@pytest.mark.asyncio
+async def test_send_reconnects_on_disconnect(sender):
+    await sender.send(sender.build_message("first", ["user@example.com"], "<p>hi</p>"))
+    FakeSMTP.fail_next_send = True
+    await sender.send(sender.build_message("second", ["user@example.com"], "<p>hi</p>"))
+
+    assert len(FakeSMTP.instances) == 2
+    assert FakeSMTP.instances[1].sent[0]["Subject"] == "second"
+    assert sender.idle == [FakeSMTP.instances[1]]
+
+
+@pytest.mark.asyncio
+async def test_send_raises_connect_error_without_reconnecting(sender):
+    reconnected = email_send_outcomes.get(outcome="reconnected")
+    FakeSMTP.fail_connect = True
+
+    with pytest.raises(aiosmtplib.SMTPConnectError):
+        await sender.send(sender.build_message("subject", ["user@example.com"], "<p>hi</p>"))
+
+    assert len(FakeSMTP.instances) == 1
+    assert email_send_outcomes.get(outcome="reconnected") == reconnected
+    assert sender.idle == []
+
+
+@pytest.mark.asyncio
+async def test_connect_closes_client_when_login_fails(sender):
+    FakeSMTP.fail_login = True
+
+    with pytest.raises(aiosmtplib.SMTPAuthenticationError):
+        await sender.connect()
+
+    assert not FakeSMTP.instances[0].is_connected
+
+
+@pytest.mark.asyncio
+async def test_send_span_records_recipient_count_only(sender, monkeypatch):
+    tracer = Tracer(exporter=SpanExporter(service_name="test", flush_interval=60), sample_rate=1.0)
+    monkeypatch.setattr(mailer, "tracer", tracer)
+
+    with tracer.start_trace("job send_email"):
+        await sender.send(sender.build_message("subject", ["a@example.com", "b@example.com"], "<p>hi</p>"))
+
+    span = next(span for span in tracer.exporter.buffer if span.name == "smtp send")
+    assert span.attributes == {"recipients": 2}
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_idle_connections(sender):
+    await sender.send(sender.build_message("subject", ["user@example.com"], "<p>hi</p>"))
+    await sender.stop()
+
+    assert sender.idle == []
+    assert not FakeSMTP.instances[0].is_connected
+
+
+def test_build_message_headers(sender):
+    message = sender.build_message("subject", ["a@example.com", "b@example.com"], "<p>hi</p>")
+
+    assert message["To"] == "a@example.com, b@example.com"
+    assert message["Subject"] == "subject"
+    assert message.get_content_type() == "text/html"
+
+
+def test_build_message_with_text_alternative(sender):
+    message = sender.build_message("subject", ["a@example.com"], "<p>hi</p>", text="hi")
+
+    assert message.get_content_type() == "multipart/alternative"
+    assert [part.get_content_type() for part in message.iter_parts()] == ["text/plain", "text/html"]
@@ -10,6 +10,7 @@ from server.services.messages import (
     http_exc_403_forbidden_request,
     http_exc_404_key_expired,
     http_exc_404_not_found,
+    http_exc_503_service_unavailable,
 )
 
 
@@ -19,6 +20,14 @@ async def test_http_exc_400_credentials_bad_signup_request():
     assert result.status_code == status.HTTP_400_BAD_REQUEST
     assert "msg" in result.detail
     assert result.detail["msg"] == "Signup failed! Recheck all your credentials!"
+    assert "field" not in result.detail
+
+
+@pytest.mark.asyncio
+async def test_http_exc_400_credentials_bad_signup_request_names_field():
+    result = await http_exc_400_credentials_bad_signup_request(field="email")
+    assert result.status_code == status.HTTP_400_BAD_REQUEST
+    assert result.detail == {"msg": "Signup failed! Recheck all your credentials!", "field": "email"}
 
 
 @pytest.mark.asyncio
@@ -77,3 +86,12 @@ async def test_http_exc_404_key_expired():
     assert result.status_code == status.HTTP_404_NOT_FOUND
     assert "msg" in result.detail
     assert result.detail["msg"] == "Provided key has expired! Please validate before expiration."
+
+
+@pytest.mark.asyncio
+async def test_http_exc_503_service_unavailable():
+    result = await http_exc_503_service_unavailable()
+    assert result.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "msg" in result.detail
+    assert result.detail["msg"] == "Server is busy! Please try again shortly."
+    assert result.headers["Retry-After"] == "1"
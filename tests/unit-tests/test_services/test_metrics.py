@@ -0,0 +1,68 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.services.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    http_request_duration,
+)
+
+
+def test_counter_renders_labels():
+    counter = Counter("cache_requests_total", "Cache lookups.", labelnames=("result",))
+    counter.inc(result="hit")
+    counter.inc(2, result="hit")
+    counter.inc(result='mi"ss')
+
+    assert counter.get(result="hit") == 3
+    assert counter.render() == [
+        "# HELP cache_requests_total Cache lookups.",
+        "# TYPE cache_requests_total counter",
+        'cache_requests_total{result="hit"} 3',
+        'cache_requests_total{result="mi\\"ss"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("duration_seconds", "Durations.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.get_count() == 4
+    assert histogram.samples() == [
+        'duration_seconds_bucket{le="0.1"} 2',
+        'duration_seconds_bucket{le="1.0"} 3',
+        'duration_seconds_bucket{le="+Inf"} 4',
+        "duration_seconds_sum 2.65",
+        "duration_seconds_count 4",
+    ]
+
+
+def test_registry_renders_gauges_at_scrape_time():
+    values = [1]
+    registry = MetricsRegistry()
+    registry.register(Gauge("pending", "Pending jobs.", function=lambda: values[-1]))
+    values.append(5)
+
+    assert registry.render().endswith("pending 5\n")
+
+
+def test_middleware_labels_requests_by_route_name():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}", name="items:read-item")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    before = http_request_duration.get_count(route="items:read-item", method="GET", status="200")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert http_request_duration.get_count(route="items:read-item", method="GET", status="200") == before + 2
+    assert http_request_duration.get_count(route="unmatched", method="GET", status="404") >= 1
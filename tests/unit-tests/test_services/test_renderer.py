@@ -0,0 +1,36 @@
+import pytest
+
+from server.services.renderer import EmailRenderer
+from server.services.validators import EmailTemplates
+
+
+@pytest.fixture
+def renderer():
+    email_renderer = EmailRenderer(directory="server/templates")
+    email_renderer.load()
+    return email_renderer
+
+
+def test_load_compiles_every_template(renderer):
+    assert set(renderer.templates) == {template.value for template in EmailTemplates}
+
+
+@pytest.mark.parametrize("template", list(EmailTemplates))
+def test_render_html_and_text(renderer, template):
+    rendered = renderer.render(template, {"subject": "subject", "url": "https://example.com/key", "username": "john"})
+
+    assert "Hi john," in rendered.html
+    assert 'href="https://example.com/key"' in rendered.html
+    assert "<" not in rendered.text
+    assert "Hi john," in rendered.text
+    assert "https://example.com/key" in rendered.text
+
+
+def test_render_escapes_html_only(renderer):
+    rendered = renderer.render(
+        EmailTemplates.account_activation,
+        {"subject": "subject", "url": "https://example.com/key", "username": "<b>john</b>"},
+    )
+
+    assert "&lt;b&gt;john&lt;/b&gt;" in rendered.html
+    assert "<b>john</b>" in rendered.text
@@ -0,0 +1,30 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from server.schemas.account import AccountInformationResponse
+from server.services.responses import APIResponse, dump_json
+
+
+def test_dump_json_formats_datetimes_like_the_schemas():
+    timestamp = datetime(2023, 2, 5, 11, 44, 39, 272446)
+    assert dump_json({"at": timestamp}) == b'{"at":"2023-02-05T11:44:39.272446Z"}'
+
+
+def test_api_response_renders_schema_by_alias():
+    account = AccountInformationResponse(
+        id=1,
+        username="someuser1",
+        email="someuser1@example.com",
+        created_at=datetime(2023, 2, 5, 11, 44, 39),
+    )
+    response = APIResponse(account)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == json.loads(account.json(by_alias=True))
+
+
+def test_dump_json_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dump_json({"value": object()})
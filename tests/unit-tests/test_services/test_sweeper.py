@@ -0,0 +1,35 @@
+import pytest
+
+from server.services import sweeper
+from server.services.sweeper import ValidationKeySweeper
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeValidationCRUD:
+    batches = []
+
+    def __init__(self, session):
+        self.session = session
+
+    async def delete_expired_account_validations(self, batch_size: int) -> int:
+        return self.batches.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_sweep_deletes_until_short_batch(monkeypatch):
+    FakeValidationCRUD.batches = [10, 10, 3, 10]
+    monkeypatch.setattr(sweeper, "get_database_session", lambda: FakeSession)
+    monkeypatch.setattr(sweeper, "AccountValidationCRUD", FakeValidationCRUD)
+
+    key_sweeper = ValidationKeySweeper(interval=60, batch_size=10)
+    assert await key_sweeper.sweep() == 23
+    assert key_sweeper.last_purged == 23
+    assert key_sweeper.total_purged == 23
+    assert FakeValidationCRUD.batches == [10]
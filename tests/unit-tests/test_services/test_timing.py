@@ -0,0 +1,95 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from server.services.timing import (
+    RequestTiming,
+    ServerTimingMiddleware,
+    instrument_engine,
+    request_timing,
+    track,
+)
+
+
+def test_track_without_request_is_a_noop():
+    with track("cache"):
+        pass
+
+    assert request_timing.get() is None
+
+
+def test_server_timing_skips_unused_dependencies():
+    timing = RequestTiming()
+    timing.add("db", 0.002)
+    timing.add("db", 0.001)
+    timing.add("hash", 0.25)
+
+    assert timing.get_server_timing() == 'db;dur=3.00;desc="2 queries", hash;dur=250.00;desc="1 hashes"'
+
+
+def test_engine_statements_are_counted_per_request():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    timing = RequestTiming()
+    token = request_timing.set(timing)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+    finally:
+        request_timing.reset(token)
+
+    assert timing.counts["db"] == 3
+    assert timing.statements["SELECT 1"] == 3
+
+
+def make_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, **options)
+
+    @app.get("/work")
+    @app.get("/auth/signin")
+    async def work():
+        for _ in range(3):
+            with track("cache"):
+                pass
+        timing = request_timing.get()
+        if timing is not None:
+            timing.statements["SELECT * FROM accounts WHERE id = $1"] += 4
+            timing.add("db", 0.001)
+            timing.add("hash", 0.25)
+        return {}
+
+    return app
+
+
+def test_middleware_sets_server_timing_header():
+    response = TestClient(make_app(enabled=True)).get("/work")
+
+    assert "cache;dur=" in response.headers["server-timing"]
+    assert 'desc="3 cache calls"' in response.headers["server-timing"]
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+    assert 'desc="1 hashes"' in response.headers["server-timing"]
+
+
+def test_middleware_hides_hashing_time_on_auth_routes():
+    response = TestClient(make_app(enabled=True)).get("/auth/signin")
+
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+    assert "hash" not in response.headers["server-timing"]
+
+
+def test_middleware_sends_no_header_by_default():
+    response = TestClient(make_app()).get("/work")
+
+    assert "server-timing" not in response.headers
+
+
+def test_middleware_logs_requests_over_budget(caplog):
+    with caplog.at_level(logging.WARNING, logger="server.services.timing"):
+        TestClient(make_app(query_budget=0, time_budget=0.0001)).get("/work")
+
+    assert "GET /work ran 1 queries" in caplog.text
+    assert "4 times: SELECT * FROM accounts WHERE id = $1" in caplog.text
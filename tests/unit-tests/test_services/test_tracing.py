@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.services import tracing
+from server.services.tracing import (
+    FileSpanExporter,
+    SpanExporter,
+    Tracer,
+    TracingMiddleware,
+    traced,
+)
+
+
+class ListSpanExporter(SpanExporter):
+    def __init__(self):
+        super().__init__(service_name="test", flush_interval=60)
+        self.payloads = []
+
+    async def export(self, payload):
+        self.payloads.append(payload)
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    test_tracer = Tracer(exporter=ListSpanExporter(), sample_rate=1.0)
+    monkeypatch.setattr(tracing, "tracer", test_tracer)
+    return test_tracer
+
+
+def test_child_spans_share_the_trace(tracer):
+    with tracer.start_trace("GET /users/me") as root:
+        with tracer.span("get_current_user", cached=True) as child:
+            pass
+
+    assert [span.name for span in tracer.exporter.buffer] == ["get_current_user", "GET /users/me"]
+    assert child.trace_id == root.trace_id
+    assert child.parent_id == root.span_id
+    assert child.attributes == {"cached": True}
+
+
+def test_record_sampled_root(tracer):
+    context = tracer.sample()
+    with tracer.record(tracing.Span(*context, "GET /users/me", kind=2)) as root:
+        with tracer.span("get_current_user") as child:
+            pass
+
+    assert tracing.current_span.get() is None
+    assert child.parent_id == root.span_id
+    assert [span.name for span in tracer.exporter.buffer] == ["get_current_user", "GET /users/me"]
+
+
+def test_sampled_out_trace_records_nothing(tracer):
+    tracer.sample_rate = 0.0
+    with tracer.start_trace("GET /users/me") as root:
+        with tracer.span("get_current_user") as child:
+            tracer.add_span("db.query", 0, 1)
+
+    assert root is None and child is None
+    assert tracer.exporter.buffer == []
+
+
+def test_traceparent_sampled_flag_is_ignored_by_default(tracer):
+    tracer.sample_rate = 0.0
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    with tracer.start_trace("forced", traceparent=f"00-{trace_id}-{parent_id}-01") as skipped:
+        pass
+    tracer.sample_rate = 1.0
+    with tracer.start_trace("sampled", traceparent=f"00-{trace_id}-{parent_id}-00") as span:
+        pass
+
+    assert skipped is None
+    assert (span.trace_id, span.parent_id) == (trace_id, parent_id)
+
+
+def test_traceparent_keeps_trusted_callers_decision(tracer):
+    tracer.sample_rate = 0.0
+    tracer.trust_parent_sampling = True
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    with tracer.start_trace("sampled", traceparent=f"00-{trace_id}-{parent_id}-01") as span:
+        pass
+    with tracer.start_trace("not sampled", traceparent=f"00-{trace_id}-{parent_id}-00") as skipped:
+        pass
+
+    assert (span.trace_id, span.parent_id) == (trace_id, parent_id)
+    assert skipped is None
+
+
+def test_failed_span_has_error_status(tracer):
+    with pytest.raises(ValueError):
+        with tracer.start_trace("job send_email"):
+            raise ValueError("boom")
+
+    [span] = tracer.exporter.buffer
+    assert span.to_otlp()["status"] == {"code": 2, "message": "ValueError('boom')"}
+
+
+def test_traced_is_a_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "tracer", Tracer(exporter=None, sample_rate=1.0))
+
+    async def work():
+        return 1
+
+    assert traced("work")(work) is work
+
+
+@pytest.mark.asyncio
+async def test_file_exporter_writes_otlp_batches(tmp_path, tracer):
+    exporter = FileSpanExporter(path=str(tmp_path / "traces.jsonl"), service_name="fast-auth", flush_interval=60)
+    tracer.exporter = exporter
+    with tracer.start_trace("GET /health"):
+        pass
+
+    assert await exporter.flush() == 1
+    [line] = (tmp_path / "traces.jsonl").read_text().splitlines()
+    resource_spans = json.loads(line)["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "fast-auth"}
+    assert resource_spans["scopeSpans"][0]["spans"][0]["name"] == "GET /health"
+
+
+def test_middleware_names_root_span_after_route(tracer):
+    @traced("load_item")
+    async def load_item(item_id: int):
+        await asyncio.sleep(0)
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}", name="items:read-item")
+    async def read_item(item_id: int):
+        return await load_item(item_id)
+
+    response = TestClient(app).get("/items/1")
+
+    assert response.status_code == 200
+    child, root = tracer.exporter.buffer
+    assert child.name == "load_item"
+    assert child.parent_id == root.span_id
+    assert root.name == "GET items:read-item"
+    assert root.attributes["http.status_code"] == 200
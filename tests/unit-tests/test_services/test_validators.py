@@ -1,4 +1,4 @@
-from server.services.validators import EmailTemplates, Gender, Tags
+from server.services.validators import EmailTemplates, Gender, Tags, ValidationKeyStore
 
 
 def test_gender_enum():
@@ -15,3 +15,8 @@ def test_tags_enum():
 def test_email_templates_enum():
     assert EmailTemplates.account_activation.value == "account-activation"
     assert EmailTemplates.password_reset.value == "password-reset"
+
+
+def test_validation_key_store_enum():
+    assert ValidationKeyStore.database.value == "database"
+    assert ValidationKeyStore.redis.value == "redis"
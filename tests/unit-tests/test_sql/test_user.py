@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from server.sql.user import get_violated_unique_field
+
+
+class UniqueViolationError(Exception):
+    def __init__(self, constraint_name):
+        super().__init__("duplicate key value violates unique constraint")
+        self.constraint_name = constraint_name
+
+
+def make_integrity_error(cause: Exception, message: str = "") -> IntegrityError:
+    orig = Exception(message)
+    orig.__cause__ = cause
+    return IntegrityError("INSERT INTO accounts ...", {}, orig)
+
+
+@pytest.mark.parametrize("field", ["username", "email", "phone_number"])
+def test_get_violated_unique_field_from_constraint_name(field):
+    error = make_integrity_error(UniqueViolationError(f"ix_accounts_{field}"))
+    assert get_violated_unique_field(error) == field
+
+
+def test_get_violated_unique_field_from_message():
+    error = make_integrity_error(None, 'duplicate key value violates unique constraint "ix_accounts_email"')
+    assert get_violated_unique_field(error) == "email"
+
+
+def test_get_violated_unique_field_unknown_constraint():
+    error = make_integrity_error(UniqueViolationError("accounts_pkey"))
+    assert get_violated_unique_field(error) == "account"
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from server.cache.queue import Job
+from server.worker import Worker
+
+
+class FakeQueue:
+    stream = "jobs"
+    group = "workers"
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs or []
+        self.acked = []
+        self.retried = []
+        self.dead = []
+
+    async def promote_due_jobs(self):
+        return 0
+
+    async def claim_stale_jobs(self, consumer, min_idle, count):
+        return []
+
+    async def read_jobs(self, consumer, count, block):
+        jobs, self.jobs = self.jobs[:count], self.jobs[count:]
+        return jobs
+
+    async def ack(self, job_id):
+        self.acked.append(job_id)
+
+    async def retry(self, job, delay):
+        self.retried.append((job.id, delay))
+
+    async def dead_letter(self, job, error):
+        self.dead.append((job.id, error))
+
+
+def get_worker(queue, handlers, concurrency=2):
+    return Worker(
+        queue=queue,
+        handlers=handlers,
+        concurrency=concurrency,
+        max_attempts=3,
+        backoff=2.0,
+        backoff_max=10.0,
+        claim_idle=60000,
+        consumer="test",
+    )
+
+
+async def failing_handler(payload):
+    raise RuntimeError("relay unavailable")
+
+
+@pytest.mark.asyncio
+async def test_process_acknowledges_successful_job():
+    handled = []
+
+    async def handler(payload):
+        handled.append(payload)
+
+    queue = FakeQueue()
+    await get_worker(queue, {"send_email": handler}).process(Job("1-0", "send_email", {"account_id": 7}, 0))
+
+    assert handled == [{"account_id": 7}]
+    assert queue.acked == ["1-0"]
+
+
+@pytest.mark.asyncio
+async def test_process_retries_then_dead_letters():
+    queue = FakeQueue()
+    worker = get_worker(queue, {"send_email": failing_handler})
+
+    await worker.process(Job("1-0", "send_email", {}, 0))
+    await worker.process(Job("2-0", "send_email", {}, 2))
+
+    assert [job_id for job_id, _ in queue.retried] == ["1-0"]
+    assert 1.0 <= queue.retried[0][1] <= 2.0
+    assert queue.dead == [("2-0", "RuntimeError('relay unavailable')")]
+    assert queue.acked == []
+
+
+@pytest.mark.asyncio
+async def test_process_dead_letters_unknown_job():
+    queue = FakeQueue()
+    await get_worker(queue, {}).process(Job("1-0", "unknown", {}, 0))
+
+    assert queue.dead[0][0] == "1-0"
+
+
+def test_retry_delay_is_capped():
+    worker = get_worker(FakeQueue(), {})
+
+    assert worker.get_retry_delay(10) <= 10.0
+    assert worker.get_retry_delay(0) <= 2.0
+
+
+@pytest.mark.asyncio
+async def test_poll_respects_concurrency():
+    release = asyncio.Event()
+    started = []
+
+    async def handler(payload):
+        started.append(payload["n"])
+        await release.wait()
+
+    queue = FakeQueue([Job(f"{n}-0", "send_email", {"n": n}, 0) for n in range(5)])
+    worker = get_worker(queue, {"send_email": handler}, concurrency=2)
+
+    assert await worker.poll(block=0) == 2
+    await asyncio.sleep(0)
+    assert started == [0, 1]
+
+    release.set()
+    assert await worker.poll(block=0) == 0
+    await asyncio.sleep(0)
+    assert queue.acked == ["0-0", "1-0"]
+    assert await worker.poll(block=0) == 2